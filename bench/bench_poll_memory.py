@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# bench/bench_poll_memory.py
+"""
+Empreinte mémoire des votes (tracemalloc) : ancienne représentation
+(dict user -> set d'index) contre les masques de bits de PollState.
+
+    python bench/bench_poll_memory.py
+"""
+import random
+import tracemalloc
+
+import fakes  # noqa: F401  (chemins + BOT_TOKEN)
+
+from cogs.polls import Choice, PollState
+
+CHOICES = 10
+PICKS = 3
+BASE_UID = 10**17  # ordre de grandeur des snowflakes Discord
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def legacy(voters: int) -> dict:
+    rnd = random.Random(voters)
+    return {BASE_UID + uid: set(rnd.sample(range(CHOICES), PICKS)) for uid in range(voters)}
+
+
+def compact(voters: int) -> PollState:
+    rnd = random.Random(voters)
+    state = PollState(
+        question="Bench ?", choices=[Choice(label=str(i)) for i in range(CHOICES)],
+        author_id=0, end_time=None, channel_id=0, allow_multi=True,
+    )
+    for uid in range(voters):
+        for idx in rnd.sample(range(CHOICES), PICKS):
+            state.toggle_multi(BASE_UID + uid, idx)
+    return state
+
+
+def main() -> None:
+    print(f"{'votants':>10}{'set/user':>14}{'masque':>14}{'o/votant':>16}")
+    for voters in (10_000, 100_000, 1_000_000):
+        old = measure(lambda: legacy(voters))
+        new = measure(lambda: compact(voters))
+        print(f"{voters:>10}{old / 1e6:>12.1f}Mo{new / 1e6:>12.1f}Mo"
+              f"{old / voters:>8.0f} → {new / voters:<4.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# bench/bench_poll_render.py
+"""
+Coût de construction d'un embed de sondage, cache de rendu froid/chaud,
+pour les trois BAR_STYLE.
+
+    python bench/bench_poll_render.py
+"""
+import timeit
+
+import fakes  # noqa: F401  (chemins + BOT_TOKEN)
+
+import cogs.polls as polls
+from cogs.polls import Choice, Polls, PollState
+
+ROUNDS = 2000
+
+
+def make_state() -> PollState:
+    state = PollState(question="Bench ?", choices=[Choice(label=f"Choix {i}", emoji="🎮") for i in range(10)],
+                      author_id=0, end_time=None, channel_id=0, message_id=1)
+    for uid in range(937):
+        state.vote_single(uid, (uid * 7) % 10)
+    return state
+
+
+def clear_caches() -> None:
+    polls._render_bar.cache_clear()
+    polls.running_field.cache_clear()
+    polls.closed_field.cache_clear()
+
+
+def main() -> None:
+    state = make_state()
+    print(f"{'style':<10}{'froid (µs)':>12}{'chaud (µs)':>12}{'résultats chaud (µs)':>22}")
+    for style in ("gradient", "emoji", "glass"):
+        polls.BAR_STYLE = style
+
+        def cold():
+            clear_caches()
+            Polls.build_running_embed(None, state, None)
+
+        cold_t = timeit.timeit(cold, number=ROUNDS) / ROUNDS
+        warm_t = timeit.timeit(lambda: Polls.build_running_embed(None, state, None), number=ROUNDS) / ROUNDS
+        closed_t = timeit.timeit(lambda: Polls.build_closed_embed(None, state, None), number=ROUNDS) / ROUNDS
+        print(f"{style:<10}{cold_t * 1e6:>12.1f}{warm_t * 1e6:>12.1f}{closed_t * 1e6:>22.1f}")
+    print("cache barres :", polls._render_bar.cache_info())
+
+
+if __name__ == "__main__":
+    main()
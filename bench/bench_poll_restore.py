@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# bench/bench_poll_restore.py
+"""
+Temps de restauration des sondages ouverts au chargement du cog : lecture de
+data/polls.db, reconstruction des PollState, vues persistantes et échéances.
+
+    python bench/bench_poll_restore.py [--polls 1000] [--votes 50]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from fakes import FakeBot, RecordingHTTP, chdir_tmp
+
+from cogs.poll_store import PollStore
+from cogs.polls import Polls
+
+CHOICES = 4
+ROUNDS = 5
+
+
+def seed(polls: int, votes: int) -> None:
+    rnd = random.Random(polls)
+    store = PollStore()
+    end = time.time() + 3600
+    for mid in range(1, polls + 1):
+        multi = mid % 3 == 0
+        store.save_poll(mid, 1, 0, f"Question {mid} ?", [(f"Choix {i}", None) for i in range(CHOICES)],
+                        multi, end if mid % 2 else None)
+        for uid in range(votes):
+            store.record_vote(mid, uid, rnd.randrange(1, 1 << CHOICES) if multi else rnd.randrange(CHOICES))
+    store.close()
+
+
+async def restore() -> tuple[float, Polls, RecordingHTTP]:
+    http = RecordingHTTP()
+    cog = Polls(FakeBot(http))
+    t0 = time.perf_counter()
+    await cog.cog_load()
+    elapsed = time.perf_counter() - t0
+    await cog.cog_unload()
+    return elapsed, cog, http
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--polls", type=int, default=1000)
+    parser.add_argument("--votes", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = chdir_tmp()
+    try:
+        seed(args.polls, args.votes)
+        samples = []
+        for _ in range(ROUNDS):
+            elapsed, cog, http = asyncio.run(restore())
+            samples.append(elapsed)
+        restored = len(cog._sessions)
+        voters = sum(s.total > 0 for s in cog._sessions.values())
+        print(f"{restored} sondage(s), {args.votes} vote(s) chacun : "
+              f"médiane {statistics.median(samples) * 1000:.1f} ms, "
+              f"min {min(samples) * 1000:.1f} ms sur {ROUNDS} chargements • "
+              f"vues {len(cog.bot.views)} • REST {http.total}")
+        assert restored == args.polls, (restored, args.polls)
+        assert voters == args.polls or args.votes == 0
+        assert http.total == 0   # aucune requête Discord au démarrage
+        print("ok")
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# bench/bench_poll_tallies.py
+"""
+Micro-benchmark : coût d'un rendu d'embed de sondage selon le nombre de votants.
+Avec les compteurs incrémentaux, le temps de rendu doit rester plat.
+
+    python bench/bench_poll_tallies.py
+"""
+import random
+import timeit
+
+import fakes  # noqa: F401  (chemins + BOT_TOKEN)
+
+from cogs.polls import Choice, Polls, PollState
+
+ROUNDS = 200
+
+
+def make_state(voters: int, multi: bool) -> PollState:
+    state = PollState(
+        question="Bench ?",
+        choices=[Choice(label=f"Choix {i}") for i in range(10)],
+        author_id=0, end_time=None, channel_id=0, message_id=1, allow_multi=multi,
+    )
+    rnd = random.Random(voters)
+    for uid in range(voters):
+        if multi:
+            for idx in rnd.sample(range(10), 3):
+                state.toggle_multi(uid, idx)
+        else:
+            state.vote_single(uid, rnd.randrange(10))
+    return state
+
+
+def main() -> None:
+    print(f"{'mode':<8}{'votants':>10}{'rendu (µs)':>14}{'recompte (µs)':>16}")
+    for multi in (False, True):
+        for voters in (1_000, 10_000, 100_000):
+            state = make_state(voters, multi)
+            assert state.check_tallies()
+            render = timeit.timeit(lambda: Polls.build_running_embed(None, state, None), number=ROUNDS)
+            recount = timeit.timeit(state.recount, number=20)
+            print(f"{'multi' if multi else 'unique':<8}{voters:>10}"
+                  f"{render / ROUNDS * 1e6:>14.1f}{recount / 20 * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
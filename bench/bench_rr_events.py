@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# bench/bench_rr_events.py
+"""
+Coût d'une réaction brute sur un message qui n'est pas un panneau Reaction Roles :
+relecture du JSON à chaque évènement (ancien code) contre index mémoire.
+
+    python bench/bench_rr_events.py --panels 300 --events 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from fakes import chdir_tmp, percentile
+
+from cogs import reaction_roles_wizard as rr
+from cogs.rr_store import LEGACY_JSON
+
+LEGACY_COPY = "legacy.json"
+
+
+def seed(panels: int) -> None:
+    """Ancien JSON : migré par le cog, et gardé en copie pour le gestionnaire historique."""
+    os.makedirs("data", exist_ok=True)
+    db = {str(10 ** 12 + i): {"guild_id": 1, "map": {"⚽": 100 + i, "🔥": 200 + i, "🎮": 300 + i}}
+          for i in range(panels)}
+    for path in (LEGACY_JSON, LEGACY_COPY):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(db, f, ensure_ascii=False, indent=2)
+
+
+async def legacy_handler(payload) -> None:
+    with open(LEGACY_COPY, "r", encoding="utf-8") as f:
+        entry = json.load(f).get(str(payload.message_id))
+    if not entry:
+        return
+
+
+async def measure(handler, events: int) -> list[float]:
+    samples = []
+    for i in range(events):
+        payload = SimpleNamespace(message_id=5 * 10 ** 12 + i, user_id=42, guild_id=1, emoji="👍")
+        t0 = time.perf_counter()
+        await handler(payload)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--panels", type=int, default=300)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        seed(args.panels)
+        cog = rr.ReactionRolesWizard(SimpleNamespace(user=SimpleNamespace(id=1)))
+        for label, handler in (("relecture JSON", legacy_handler), ("index mémoire", cog.on_raw_reaction_add)):
+            samples = asyncio.run(measure(handler, args.events))
+            print(f"{label:<15} p50={percentile(samples, 0.5) * 1e6:8.1f} µs  "
+                  f"p99={percentile(samples, 0.99) * 1e6:8.1f} µs")
+        rr.close_store()
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# bench/bench_rr_roles.py
+"""
+Rafales de réactions sur un panneau Reaction Roles : appels REST avec un
+add_roles/remove_roles par réaction (ancien code) contre la file par membre
+(seul l'écart net de la fenêtre est envoyé). Vérifie aussi que les rôles finaux
+sont identiques dans les deux cas.
+
+    python bench/bench_rr_roles.py --members 50 --roles 20
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from fakes import RecordingHTTP
+
+from cogs.reaction_roles_wizard import RoleMutationQueue
+
+GUILD = 1
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+
+    def is_default(self) -> bool:
+        return self.id == GUILD
+
+
+class FakeMember:
+    def __init__(self, http: RecordingHTTP, member_id: int, everyone: FakeRole):
+        self.http = http
+        self.id = member_id
+        self.roles = [everyone]
+
+    async def add_roles(self, *roles, reason=None):
+        for role in roles:   # discord.py : un PUT par rôle (atomic=True)
+            await self.http.request("PUT /guilds/{g}/members/{m}/roles/{r}")
+            if role not in self.roles:
+                self.roles = [*self.roles, role]
+
+    async def remove_roles(self, *roles, reason=None):
+        for role in roles:
+            await self.http.request("DELETE /guilds/{g}/members/{m}/roles/{r}")
+            self.roles = [r for r in self.roles if r.id != role.id]
+
+
+class FakeGuild:
+    def __init__(self, http: RecordingHTTP, members: int, roles: int):
+        self.id = GUILD
+        self.roles = {rid: FakeRole(rid) for rid in range(100, 100 + roles)}
+        everyone = FakeRole(GUILD)
+        self.members = {mid: FakeMember(http, mid, everyone) for mid in range(members)}
+
+    def get_role(self, role_id: int):
+        return self.roles.get(role_id)
+
+    def get_member(self, member_id: int):
+        return self.members.get(member_id)
+
+
+def script(members: int, roles: int, seed: int = 0) -> list[tuple[int, int, bool]]:
+    """Chaque membre clique tout le panneau, puis retire quelques rôles aussitôt."""
+    rnd = random.Random(seed)
+    queues = []
+    for mid in range(members):
+        picked = list(range(100, 100 + roles))
+        queues.append([(mid, rid, True) for rid in picked]
+                      + [(mid, rid, False) for rid in rnd.sample(picked, roles // 4)])
+    # membres entremêlés, ordre conservé pour chacun
+    events = []
+    while queues:
+        q = rnd.choice(queues)
+        events.append(q.pop(0))
+        if not q:
+            queues.remove(q)
+    return events
+
+
+async def direct(events, members: int, roles: int):
+    http = RecordingHTTP(latency=0.0)
+    guild = FakeGuild(http, members, roles)
+    for mid, rid, present in events:
+        member, role = guild.get_member(mid), guild.get_role(rid)
+        if present:
+            await member.add_roles(role)
+        else:
+            await member.remove_roles(role)
+    return http, guild
+
+
+async def queued(events, members: int, roles: int, window: float):
+    http = RecordingHTTP(latency=0.0)
+    guild = FakeGuild(http, members, roles)
+    queue = RoleMutationQueue(SimpleNamespace(get_guild=lambda gid: guild), window=window)
+    for mid, rid, present in events:
+        queue.set_role(GUILD, mid, rid, present)
+        await asyncio.sleep(0)
+    while queue._tasks:
+        await asyncio.sleep(window)
+    return http, guild, queue
+
+
+def final_roles(guild: FakeGuild) -> dict[int, set[int]]:
+    return {mid: {r.id for r in m.roles if not r.is_default()} for mid, m in guild.members.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--window", type=float, default=0.05)
+    args = parser.parse_args()
+    events = script(args.members, args.roles)
+
+    t0 = time.perf_counter()
+    http_a, guild_a = asyncio.run(direct(events, args.members, args.roles))
+    http_b, guild_b, queue = asyncio.run(queued(events, args.members, args.roles, args.window))
+    elapsed = time.perf_counter() - t0
+    print(f"{len(events)} réactions, {args.members} membres, panneau de {args.roles} rôles")
+    print(f"un appel par réaction : {http_a.total} appels REST")
+    print(f"file par membre       : {http_b.total} appels REST  {queue.stats}")
+    ok = final_roles(guild_a) == final_roles(guild_b)
+    print(("ok" if ok else "✗ rôles finaux différents") + f"  ({elapsed:.2f} s)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# bench/bench_rr_store.py
+"""
+Coût d'une création de panneau Reaction Roles selon le nombre de panneaux
+existants : réécriture complète du JSON (ancien save_db) contre insertion des
+seules lignes du panneau dans SQLite.
+
+    python bench/bench_rr_store.py --sizes 100 1000 10000
+"""
+import argparse
+import json
+import os
+import time
+
+from fakes import chdir_tmp
+
+from cogs.rr_store import ReactionRoleStore
+
+ROLES_PER_PANEL = 20
+WRITES = 50
+
+
+def mapping(i: int) -> dict[str, int]:
+    return {f"<:e{k}:{10 ** 17 + k}>": i * 100 + k for k in range(ROLES_PER_PANEL)}
+
+
+def json_write(db: dict, i: int) -> None:
+    db[str(i)] = {"guild_id": 1, "map": mapping(i)}
+    with open("rr.json", "w", encoding="utf-8") as f:
+        json.dump(db, f, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        print(f"{'panneaux':>9} {'JSON (ms)':>10} {'SQLite (ms)':>12}")
+        for size in args.sizes:
+            db = {str(i): {"guild_id": 1, "map": mapping(i)} for i in range(size)}
+            t0 = time.perf_counter()
+            for i in range(size, size + WRITES):
+                json_write(db, i)
+            legacy = (time.perf_counter() - t0) / WRITES
+
+            path = os.path.join("data", f"rr_{size}.db")
+            store = ReactionRoleStore(path, legacy_json="absent.json")
+            for i in range(size):
+                store.add_panel(i, 1, None, mapping(i))
+            t0 = time.perf_counter()
+            for i in range(size, size + WRITES):
+                store.add_panel(i, 1, 2, mapping(i))
+            rows = (time.perf_counter() - t0) / WRITES
+            store.close()
+            print(f"{size:>9} {legacy * 1000:>10.2f} {rows * 1000:>12.2f}")
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# bench/bench_rr_wizard.py
+"""
+Création d'un panneau Reaction Roles de N rôles : ancien parcours (message de
+test + pauses de 0,15 s / 0,2 s) contre validation locale des émojis. Compte
+les appels REST (latence simulée) et mesure la durée totale.
+
+    python bench/bench_rr_wizard.py --roles 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from fakes import RecordingHTTP, chdir_tmp
+
+from cogs import reaction_roles_wizard as rr
+from cogs.emoji_table import _table
+
+GUILD = 1
+
+
+class WizardMessage:
+    def __init__(self, http: RecordingHTTP):
+        self.http = http
+        self.id = 10 ** 18
+        self.reactions: list = []
+
+    async def add_reaction(self, emoji) -> None:
+        await self.http.request("PUT /channels/{c}/messages/{m}/reactions/{e}/@me")
+        self.reactions.append(emoji)
+
+    async def delete(self) -> None:
+        await self.http.request("DELETE /channels/{c}/messages/{m}")
+
+
+class WizardChannel:
+    def __init__(self, http: RecordingHTTP):
+        self.http = http
+        self.id = 2
+        self.mention = "#roles"
+        self.guild = SimpleNamespace(id=GUILD, me=None)
+
+    def permissions_for(self, member):
+        return SimpleNamespace(add_reactions=True, read_message_history=True, external_emojis=True)
+
+    async def send(self, *args, **kwargs) -> WizardMessage:
+        await self.http.request("POST /channels/{c}/messages")
+        return WizardMessage(self.http)
+
+
+class WizardInteraction:
+    def __init__(self, http: RecordingHTTP):
+        self.http = http
+        self.user = SimpleNamespace(id=42)
+        self.guild_id = GUILD
+        self.client = SimpleNamespace(get_emoji=lambda emoji_id: None)
+        self.response = SimpleNamespace(send_message=self._reply, defer=self._reply)
+        self.followup = SimpleNamespace(send=self._followup)
+        self.replies: list = []
+
+    async def _reply(self, content=None, **_):
+        await self.http.request("POST /interactions/{i}/callback")
+        self.replies.append(content)
+
+    async def _followup(self, content=None, **_):
+        await self.http.request("POST /webhooks/{a}/{t}")
+        self.replies.append(content)
+
+
+def roles(n: int) -> list:
+    emojis = [e for e in list(_table().values()) if "\u200d" not in e][:n]
+    return [SimpleNamespace(id=100 + i, name=f"{e} Jeu {i}", mention=f"@jeu{i}") for i, e in enumerate(emojis)]
+
+
+async def legacy(http: RecordingHTTP, n: int) -> None:
+    """Ancien parcours : chaque emoji ajouté deux fois, avec pauses."""
+    channel = WizardChannel(http)
+    emojis = [rr.sanitize_unicode_emoji(rr.emoji_from_role_name(r.name)) for r in roles(n)]
+    tmp = await channel.send("test")
+    for e in emojis:
+        await tmp.add_reaction(e)
+        await asyncio.sleep(0.15)
+    await tmp.delete()
+    msg = await channel.send("panneau")
+    for e in emojis:
+        await msg.add_reaction(e)
+        await asyncio.sleep(0.2)
+    await WizardInteraction(http)._reply("ok")
+
+
+async def current(http: RecordingHTTP, n: int) -> WizardInteraction:
+    view = rr.RolePickView(42, WizardChannel(http), "Jeux", None)
+    view.role_select._values = roles(n)
+    interaction = WizardInteraction(http)
+    await view.confirm.callback(interaction)
+    return interaction
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        for label, flow in (("message de test", legacy), ("validation locale", current)):
+            http = RecordingHTTP(latency=args.latency)
+            t0 = time.perf_counter()
+            result = asyncio.run(flow(http, args.roles))
+            print(f"{label:<18} {http.total:>3} appels REST  {time.perf_counter() - t0:6.2f} s")
+        ok = result.replies and result.replies[-1].startswith("✅")
+        print("ok" if ok else f"✗ {result.replies}")
+        rr.close_store()
+        return 0 if ok else 1
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# bench/bench_stats_autocomplete.py
+"""
+Autocomplétion de /stats-jeu : construction de l'index de préfixes d'une guilde
+puis latence par frappe (aucune requête SQL), et mise à jour après un flush.
+
+    python bench/bench_stats_autocomplete.py --games 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import closing
+
+from fakes import chdir_tmp, percentile
+
+from cogs.stats_store import StatsStore, normalize_game, open_db
+
+WORDS = ["Counter", "Strike", "League", "Legends", "Valorant", "Minecraft", "Rocket", "Dungeon",
+         "Star", "Craft", "Souls", "Dark", "Apex", "Fortnite", "World", "Warcraft", "Tactics"]
+
+
+def seed(path: str, games: int) -> None:
+    rnd = random.Random(0)
+    names = {f"{' '.join(rnd.sample(WORDS, 2))} {i}" for i in range(games)}
+    with closing(open_db(path)) as conn, conn:
+        conn.executemany("INSERT INTO games (name, norm) VALUES (?, ?)",
+                         ((n, normalize_game(n)) for n in names))
+        conn.executemany(
+            "INSERT INTO game_stats (guild_id, member_id, game_id, seconds) VALUES (1, ?, ?, ?)",
+            ((m, gid, rnd.randrange(60, 36000)) for gid in range(1, len(names) + 1) for m in range(3)),
+        )
+        conn.execute("INSERT INTO game_aliases (norm, game_id) VALUES ('cs2', 1)")
+
+
+async def run(path: str) -> int:
+    store = StatsStore(path)
+    failures = 0
+    try:
+        t0 = time.perf_counter()
+        index = await store.game_index(1)
+        print(f"construction : {len(index.names)} jeux, {len(index._keys)} clés en "
+              f"{(time.perf_counter() - t0) * 1000:.1f} ms")
+        samples = []
+        empty = set()
+        for text in ["", "c", "co", "str", "strike 1", "war", "craft", "dark s", "cs", "zzz"] * 50:
+            t0 = time.perf_counter()
+            found = index.search(text)
+            samples.append(time.perf_counter() - t0)
+            if not found:
+                empty.add(text)
+        print(f"recherche : p50={percentile(samples, 0.5) * 1e6:.0f} µs  p99={percentile(samples, 0.99) * 1e6:.0f} µs")
+        if empty != {"zzz"}:
+            print("✗ recherches sans résultat", sorted(empty))
+            failures += 1
+
+        first = index.search("cs")[:1]
+        if first != [index.names[1]]:
+            print("✗ alias non trouvé", first)
+            failures += 1
+        # un flush fait remonter le jeu en tête sans reconstruction
+        target = index.search("apex")[-1]
+        await store.add_playtime([(1, 99, target, 10 ** 7, 20250101)])
+        if store._indexes.get(1) is not index or index.search("apex")[0] != target:
+            print("✗ index non mis à jour par le flush")
+            failures += 1
+        await store.add_playtime([(1, 99, "Nouveau Jeu", 60, 20250101)])
+        if "Nouveau Jeu" not in (await store.game_index(1)).search("nouv"):
+            print("✗ nouveau jeu absent après reconstruction")
+            failures += 1
+    finally:
+        store.close()
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        seed("stats.db", args.games)
+        failures = asyncio.run(run("stats.db"))
+        print("ok" if not failures else f"{failures} échec(s)")
+        return 1 if failures else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
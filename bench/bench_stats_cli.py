@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# bench/bench_stats_cli.py
+"""
+Débit de stats_cli.py : export puis import (CSV et JSONL) de game_stats et
+playtime_daily, dans une base vide puis par-dessus les mêmes lignes (cumul).
+Vérifie les totaux, la cohérence du rollup guild_game_totals, qu'un fichier
+invalide n'importe rien et que le bot voit l'import (StatsStore.sync_external).
+
+    python bench/bench_stats_cli.py --rows 1000000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from contextlib import closing
+
+from fakes import chdir_tmp
+
+import stats_cli
+from cogs.stats_store import StatsStore, open_db
+
+GAMES = 2000
+ROLLUP_CHECK_SQL = """
+SELECT guild_id, game_id, SUM(seconds), COUNT(*) FROM game_stats GROUP BY 1, 2
+EXCEPT
+SELECT guild_id, game_id, seconds, players FROM guild_game_totals
+"""
+
+
+def seed(path: str, rows: int) -> None:
+    rnd = random.Random(0)
+    with closing(open_db(path)) as conn, conn:
+        conn.executemany("INSERT INTO games (id, name, norm) VALUES (?, ?, ?)",
+                         ((i, f"Jeu {i}", f"jeu {i}") for i in range(1, GAMES + 1)))
+        conn.executemany(
+            "INSERT OR IGNORE INTO game_stats (guild_id, member_id, game_id, seconds) VALUES (?, ?, ?, ?)",
+            ((rnd.randrange(1, 4), rnd.randrange(rows // 5), rnd.randrange(1, GAMES + 1), rnd.randrange(1, 36000))
+             for _ in range(rows)),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO playtime_daily (guild_id, day, member_id, game_id, seconds) VALUES (?, ?, ?, ?, ?)",
+            ((rnd.randrange(1, 4), 20260901 + rnd.randrange(30), rnd.randrange(rows // 20),
+              rnd.randrange(1, GAMES + 1), rnd.randrange(1, 36000)) for _ in range(rows)),
+        )
+
+
+def total(path: str, table: str) -> int:
+    with closing(open_db(path)) as conn:
+        return conn.execute(f"SELECT SUM(seconds) FROM {table}").fetchone()[0]
+
+
+def check_invalid(path: str, dest: str) -> int:
+    """Ligne invalide en fin de fichier : rien ne doit être écrit."""
+    bad = "bad_" + path
+    with open(path, encoding="utf-8") as src, open(bad, "w", encoding="utf-8") as out:
+        out.writelines(src)
+        out.write("1,pas-un-nombre,Jeu 1,10\n")
+    before = total(dest, "game_stats")
+    try:
+        stats_cli.import_file(dest, "game_stats", bad, "csv")
+    except SystemExit as exc:
+        print(f"fichier invalide : {exc}")
+    else:
+        print("✗ fichier invalide accepté")
+        return 1
+    if total(dest, "game_stats") != before:
+        print("✗ import partiel d'un fichier invalide")
+        return 1
+    return 0
+
+
+async def check_bot_sees_import(path: str, dest: str) -> int:
+    """Caches du bot (classement) vidés après un import hors processus."""
+    store = StatsStore(dest)
+    try:
+        await store.sync_external()
+        before = await store.top_games(1, 1)
+        if await store.sync_external():
+            print("✗ invalidation sans écriture externe")
+            return 1
+        await asyncio.to_thread(stats_cli.import_file, dest, "game_stats", path, "csv")
+        if not await store.sync_external() or await store.top_games(1, 1) == before:
+            print("✗ le bot sert encore l'ancien classement après import")
+            return 1
+    finally:
+        store.close()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    failures = 0
+    try:
+        seed("src.db", args.rows)
+        for table in ("game_stats", "playtime_daily"):
+            expected = total("src.db", table)
+            for fmt in ("csv", "jsonl"):
+                path = f"{table}.{fmt}"
+                t0 = time.perf_counter()
+                count = stats_cli.export("src.db", table, path, fmt)
+                exported = time.perf_counter() - t0
+                dest = f"{table}_{fmt}.db"
+                rates = []
+                for _ in range(2):   # base vide, puis cumul sur les mêmes lignes
+                    t0 = time.perf_counter()
+                    stats_cli.import_file(dest, table, path, fmt)
+                    rates.append(count / (time.perf_counter() - t0))
+                print(f"{table:<15} {fmt:<5} {count} lignes  export {count / exported:>9,.0f} l/s  "
+                      f"import {rates[0]:>9,.0f} l/s (vide)  {rates[1]:>9,.0f} l/s (cumul)")
+                if total(dest, table) != 2 * expected:
+                    print(f"✗ {table} {fmt} : total {total(dest, table)} ≠ {2 * expected}")
+                    failures += 1
+                if table == "game_stats":
+                    with closing(open_db(dest)) as conn:
+                        if conn.execute(ROLLUP_CHECK_SQL).fetchone():
+                            print(f"✗ rollup incohérent après import {fmt}")
+                            failures += 1
+        failures += check_invalid("game_stats.csv", "game_stats_csv.db")
+        failures += asyncio.run(check_bot_sees_import("game_stats.csv", "game_stats_csv.db"))
+        print("ok" if not failures else f"{failures} échec(s)")
+        return 1 if failures else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# bench/bench_stats_leaderboard.py
+"""
+/top-jeux : agrégation GROUP BY sur game_stats (ancien code) contre lecture
+ponctuelle de guild_game_totals (rollup tenu par triggers), puis cache.
+Vérifie aussi que le rollup reste exact après flush, alias et reset.
+
+    python bench/bench_stats_leaderboard.py --rows 1000000
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import closing
+
+from fakes import chdir_tmp, percentile
+
+from cogs.stats_store import MEMBER_RANKS_SQL, TOP_GAMES_SQL, StatsStore, open_db
+
+GROUP_BY_SQL = """
+SELECT g.name, SUM(s.seconds) AS total, COUNT(*)
+FROM game_stats s JOIN games g ON g.id = s.game_id
+WHERE s.guild_id = ?
+GROUP BY s.game_id
+ORDER BY total DESC
+LIMIT ?
+"""
+CHECK_SQL = """
+SELECT guild_id, game_id, SUM(seconds), COUNT(*) FROM game_stats GROUP BY 1, 2
+EXCEPT
+SELECT guild_id, game_id, seconds, players FROM guild_game_totals
+"""
+# rang de référence : fenêtre RANK() sur tous les joueurs de chaque jeu du membre
+NAIVE_RANKS_SQL = """
+SELECT g.name, r.rnk FROM (
+    SELECT member_id, game_id, RANK() OVER (PARTITION BY game_id ORDER BY seconds DESC) AS rnk
+    FROM game_stats
+    WHERE guild_id = ? AND game_id IN (SELECT game_id FROM game_stats WHERE guild_id = ? AND member_id = ?)
+) r JOIN games g ON g.id = r.game_id
+WHERE r.member_id = ?
+"""
+GAMES = 2000
+
+
+def seed(path: str, rows: int) -> float:
+    rnd = random.Random(0)
+    t0 = time.perf_counter()
+    with closing(open_db(path)) as conn, conn:
+        conn.executemany("INSERT INTO games (id, name, norm) VALUES (?, ?, ?)",
+                         ((i, f"Jeu {i}", f"jeu {i}") for i in range(GAMES)))
+        conn.executemany(
+            "INSERT OR IGNORE INTO game_stats (guild_id, member_id, game_id, seconds) VALUES (1, ?, ?, ?)",
+            ((rnd.randrange(rows // 5), rnd.randrange(GAMES), rnd.randrange(1, 36000)) for _ in range(rows)),
+        )
+    return time.perf_counter() - t0
+
+
+async def timed(fn, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    print(f"{label:<22} p50={percentile(samples, 0.5) * 1000:8.3f} ms  "
+          f"p99={percentile(samples, 0.99) * 1000:8.3f} ms")
+
+
+async def run(path: str, queries: int) -> int:
+    store = StatsStore(path)
+    try:
+        report("GROUP BY game_stats", await timed(lambda: store.read(GROUP_BY_SQL, (1, 10)), queries))
+        report("rollup (SQL)", await timed(lambda: store.read(TOP_GAMES_SQL, (1, 10)), queries))
+        report("rollup + cache", await timed(lambda: store.top_games(1, 10), queries))
+
+        # /stats-moi : rangs du membre ayant le plus de jeux
+        member = (await store.read("SELECT member_id FROM game_stats GROUP BY member_id "
+                                   "ORDER BY COUNT(*) DESC LIMIT 1"))[0][0]
+        args = (1, 1, member, member)
+        report("rangs (fenêtre)", await timed(lambda: store.read(NAIVE_RANKS_SQL, args), queries))
+        report("rangs stats-moi", await timed(lambda: store.read(MEMBER_RANKS_SQL, (1, member)), queries))
+        naive = dict(await store.read(NAIVE_RANKS_SQL, args))
+        ranked = await store.read(MEMBER_RANKS_SQL, (1, member))
+        rank_failures = int(naive != {name: rank for name, _, rank, *_ in ranked})
+        print(f"membre {member} : {len(ranked)} jeux, ex. {ranked[0][0]} #{ranked[0][2]} sur {ranked[0][3]}"
+              + ("" if not rank_failures else "  ✗ rangs faux"))
+
+        # Exactitude : flush, fusion d'alias, reset d'une guilde
+        slow = await store.read(GROUP_BY_SQL, (1, 10))
+        fast = await store.top_games(1, 10)
+        failures = int(slow != fast) + rank_failures
+        t0 = time.perf_counter()
+        await store.add_playtime([(1, m, "Jeu 7", 60, 20250101) for m in range(5000)])
+        flush = time.perf_counter() - t0
+        await store.add_alias("Jeu 8", "Jeu 9")
+        await store.write("DELETE FROM game_stats WHERE guild_id = ? AND member_id < ?", (1, 100))
+        failures += len(await store.read(CHECK_SQL)) > 0
+        failures += await store.read(GROUP_BY_SQL, (1, 10)) != await store.top_games(1, 10)
+        print(f"flush 5000 lignes (triggers) : {flush * 1000:.1f} ms")
+        print("rollup exact" if not failures else "✗ rollup divergent")
+        return failures
+    finally:
+        store.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        print(f"seed {args.rows} lignes : {seed('stats.db', args.rows):.1f} s")
+        return 1 if asyncio.run(run("stats.db", args.queries)) else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
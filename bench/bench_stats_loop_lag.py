@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# bench/bench_stats_loop_lag.py
+"""
+Latence de la boucle asyncio pendant une grosse agrégation /top-jeux :
+connexion sqlite3 ouverte dans la coroutine (ancien code) contre StatsStore
+(pool de lecteurs). Un « heartbeat » simulé tourne toutes les 10 ms.
+
+    python bench/bench_stats_loop_lag.py --rows 500000
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+from contextlib import closing
+
+from fakes import chdir_tmp, percentile
+
+from cogs.stats_store import StatsStore, open_db
+
+# agrégation complète (l'ancien /top-jeux), pour charger volontairement les lecteurs
+TOP_SQL = """
+SELECT game_id, SUM(seconds) AS total
+FROM game_stats
+WHERE guild_id = ?
+GROUP BY game_id
+ORDER BY total DESC
+LIMIT 25
+"""
+TICK = 0.01
+
+
+def seed(path: str, rows: int) -> None:
+    rnd = random.Random(0)
+    with closing(open_db(path)) as conn, conn:
+        conn.executemany("INSERT INTO games (id, name, norm) VALUES (?, ?, ?)",
+                         ((i, f"Jeu {i}", f"jeu {i}") for i in range(2000)))
+        conn.executemany(
+            "INSERT OR IGNORE INTO game_stats (guild_id, member_id, game_id, seconds) VALUES (1, ?, ?, ?)",
+            ((rnd.randrange(rows // 5), rnd.randrange(2000), rnd.randrange(1, 36000)) for _ in range(rows)),
+        )
+
+
+async def heartbeat(samples: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append(time.perf_counter() - t0 - TICK)
+
+
+async def run(path: str, mode: str, queries: int) -> None:
+    samples: list[float] = []
+    stop = asyncio.Event()
+    hb = asyncio.create_task(heartbeat(samples, stop))
+    store = StatsStore(path) if mode == "store" else None
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        if store:
+            await store.read(TOP_SQL, (1,))
+        else:
+            with closing(sqlite3.connect(path)) as conn, closing(conn.cursor()) as cur:
+                cur.execute(TOP_SQL, (1,))
+                cur.fetchall()
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await hb
+    if store:
+        store.close()
+    print(f"{mode:<8} {queries} requêtes en {elapsed:.2f} s  lag p50={percentile(samples, 0.5) * 1000:.1f} ms  "
+          f"p99={percentile(samples, 0.99) * 1000:.1f} ms  max={max(samples, default=0) * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=10)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        path = "stats.db"
+        seed(path, args.rows)
+        for mode in ("direct", "store"):
+            asyncio.run(run(path, mode, args.queries))
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
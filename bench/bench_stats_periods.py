@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# bench/bench_stats_periods.py
+"""
+Historique de temps de jeu : un an de jours détaillés, compaction (jours → mois)
+puis requêtes par période de /top-jeux, /stats-moi et /stats-jeu.
+Vérifie que la compaction ne change pas les totaux « 12 mois ».
+
+    python bench/bench_stats_periods.py --members 500
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import closing
+
+from fakes import chdir_tmp, percentile
+
+from cogs import stats_store as st
+
+GAMES = 300
+PER_DAY = 3        # jeux joués par membre et par jour
+
+
+def seed(path: str, members: int, now: float) -> int:
+    rnd = random.Random(0)
+    rows = 0
+    with closing(st.open_db(path)) as conn, conn:
+        conn.executemany("INSERT INTO games (id, name, norm) VALUES (?, ?, ?)",
+                         ((i, f"Jeu {i}", f"jeu {i}") for i in range(GAMES)))
+        for back in range(365):
+            day = st.day_key(now - back * 86400)
+            batch = {(1, day, m, rnd.randrange(GAMES)): rnd.randrange(60, 7200)
+                     for m in range(members) for _ in range(PER_DAY)}
+            conn.executemany(st.UPSERT_DAILY, [k + (v,) for k, v in batch.items()])
+            rows += len(batch)
+    return rows
+
+
+async def timed(store: st.StatsStore, sql: str, params: dict, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await store.read(sql, params)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def run(path: str, now: float, queries: int) -> int:
+    store = st.StatsStore(path)
+    failures = 0
+    try:
+        year = {"guild": 1, "limit": 25, **st.period_bounds("12m", now)}
+        before = await store.read(st.PERIOD_TOP_GAMES_SQL, year)
+        t0 = time.perf_counter()
+        moved, dropped = await store.compact(now)
+        print(f"compaction : {moved} lignes jour → mois en {(time.perf_counter() - t0) * 1000:.0f} ms "
+              f"({dropped} mois supprimés)")
+        after = await store.read(st.PERIOD_TOP_GAMES_SQL, year)
+        if [r[:2] for r in before] != [r[:2] for r in after]:
+            print("✗ les totaux 12 mois changent après compaction")
+            failures += 1
+        for period in ("7j", "30j", "12m"):
+            bounds = st.period_bounds(period, now)
+            for label, sql, extra in (
+                ("top-jeux", st.PERIOD_TOP_GAMES_SQL, {"limit": 10}),
+                ("stats-moi", st.PERIOD_MEMBER_GAMES_SQL, {"member": 7}),
+                ("stats-jeu", st.PERIOD_GAME_PLAYERS_SQL, {"game": 7}),
+            ):
+                samples = await timed(store, sql, {"guild": 1, **bounds, **extra}, queries)
+                print(f"{period:<4} {label:<10} p50={percentile(samples, 0.5) * 1000:7.2f} ms  "
+                      f"p99={percentile(samples, 0.99) * 1000:7.2f} ms")
+    finally:
+        store.close()
+
+    # une session à cheval sur minuit est répartie sur les deux jours
+    midnight = (int(now // 86400)) * 86400
+    split = list(st.split_days(midnight - 600, midnight + 900))
+    if split != [(st.day_key(midnight - 600), 600), (st.day_key(midnight), 900)]:
+        print("✗ split_days", split)
+        failures += 1
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    now = time.time()
+    try:
+        print(f"seed : {seed('stats.db', args.members, now)} lignes journalières (365 jours)")
+        failures = asyncio.run(run("stats.db", now, args.queries))
+        print("ok" if not failures else f"{failures} échec(s)")
+        return 1 if failures else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# bench/bench_vote_latency.py
+"""
+Latence d'accusé de réception d'un vote (p50/p99) contre une couche HTTP simulée :
+ancien chemin (GET message + PATCH + réponse) contre le chemin actuel
+(réponse seule, édition regroupée via PartialMessage).
+
+    python bench/bench_vote_latency.py
+"""
+import asyncio
+import time
+
+from fakes import FakeBot, FakeInteraction, RecordingHTTP, chdir_tmp, percentile
+
+from cogs.polls import Choice, Polls, PollState, PollView
+
+VOTES = 500
+CONCURRENCY = 50
+
+
+async def legacy_vote(bot: FakeBot, state: PollState, interaction: FakeInteraction, index: int) -> None:
+    state.vote_single(interaction.user.id, index)
+    msg = await bot.get_partial_messageable(state.channel_id).fetch_message(state.message_id)
+    await msg.edit(embed=None)
+    await interaction.response.send_message("ok", ephemeral=True)
+
+
+async def run(mode: str) -> None:
+    http = RecordingHTTP()
+    bot = FakeBot(http)
+    cog = Polls(bot)
+    state = PollState(question="Bench ?", choices=[Choice(label=f"C{i}") for i in range(4)],
+                      author_id=0, end_time=None, channel_id=1, message_id=1)
+    cog._sessions[1] = state
+    view = PollView(cog, state)
+    buttons = view.children
+    sem = asyncio.Semaphore(CONCURRENCY)
+    samples: list[float] = []
+
+    async def vote(uid: int) -> None:
+        async with sem:
+            inter = FakeInteraction(http, uid)
+            t0 = time.perf_counter()
+            if mode == "avant":
+                await legacy_vote(bot, state, inter, uid % 4)
+            else:
+                await buttons[uid % 4].callback(inter)
+            samples.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(vote(uid) for uid in range(VOTES)))
+    await asyncio.sleep(cog.renderer.window + 0.2)   # laisse partir le dernier rendu
+    await cog.cog_unload()
+    print(f"{mode:<6} p50={percentile(samples, 0.5) * 1000:6.1f} ms  "
+          f"p99={percentile(samples, 0.99) * 1000:6.1f} ms  "
+          f"REST/vote={http.total / VOTES:.2f}  {dict(http.calls)}")
+
+
+def main() -> None:
+    tmp = chdir_tmp()
+    try:
+        for mode in ("avant", "après"):
+            asyncio.run(run(mode))
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
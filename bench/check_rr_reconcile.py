@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# bench/check_rr_reconcile.py
+"""
+Réconciliation des panneaux Reaction Roles : rôles désynchronisés des réactions
+(bot hors ligne), passe interrompue puis reprise après « redémarrage ».
+Vérifie l'état final des rôles, la reprise sans retraiter les panneaux déjà
+faits, les panneaux migrés sans salon (retrouvé / disparu), le panneau dont le
+message a disparu et le panneau en échec (non marqué, repris à la passe suivante).
+Compte les appels REST.
+
+    python bench/check_rr_reconcile.py --panels 40 --members 300
+"""
+import argparse
+import asyncio
+import random
+import sys
+from types import SimpleNamespace
+
+import discord
+
+from fakes import RecordingHTTP, chdir_tmp
+
+from cogs import reaction_roles_wizard as rr
+
+GUILD = 1
+PANEL_CHANNEL, LEGACY_CHANNEL = 10, 11
+EMOJIS = ["⚽", "🎮", "🔥", "🎧", "🏀"]
+PAGE = 100
+NOT_FOUND = SimpleNamespace(status=404, reason="Not Found")
+
+
+class FakeRole:
+    def __init__(self, guild: "FakeGuild", role_id: int):
+        self.guild = guild
+        self.id = role_id
+
+    def is_default(self) -> bool:
+        return self.id == GUILD
+
+    @property
+    def members(self) -> list:
+        return [m for m in self.guild.members.values() if any(r.id == self.id for r in m.roles)]
+
+
+class FakeMember:
+    def __init__(self, http: RecordingHTTP, member_id: int, everyone: FakeRole):
+        self.http = http
+        self.id = member_id
+        self.roles = [everyone]
+
+    async def add_roles(self, *roles, reason=None):
+        for role in roles:   # discord.py : un PUT par rôle (atomic=True)
+            await self.http.request("PUT /guilds/{g}/members/{m}/roles/{r}")
+            if role not in self.roles:
+                self.roles = [*self.roles, role]
+
+    async def remove_roles(self, *roles, reason=None):
+        for role in roles:
+            await self.http.request("DELETE /guilds/{g}/members/{m}/roles/{r}")
+            self.roles = [r for r in self.roles if r.id != role.id]
+
+
+class FakeReaction:
+    def __init__(self, http: RecordingHTTP, emoji: str, users: list[int]):
+        self.http = http
+        self.emoji = emoji
+        self.user_ids = users
+
+    async def users(self, limit=None):
+        for i in range(0, max(len(self.user_ids), 1), PAGE):
+            await self.http.request("GET /channels/{c}/messages/{m}/reactions/{e}")
+            for uid in self.user_ids[i:i + PAGE]:
+                yield SimpleNamespace(id=uid)
+
+
+class FakeChannel:
+    def __init__(self, http: RecordingHTTP, channel_id: int):
+        self.http = http
+        self.id = channel_id
+        self.messages: dict[int, SimpleNamespace] = {}
+        self.fail_once: set[int] = set()
+
+    def permissions_for(self, member):
+        return SimpleNamespace(read_message_history=True)
+
+    async def fetch_message(self, message_id: int):
+        await self.http.request("GET /channels/{c}/messages/{m}")
+        if message_id in self.fail_once:
+            self.fail_once.discard(message_id)
+            raise discord.HTTPException(SimpleNamespace(status=500, reason="Server Error"), "boom")
+        if message_id not in self.messages:
+            raise discord.NotFound(NOT_FOUND, "Unknown Message")
+        return self.messages[message_id]
+
+
+class FakeGuild:
+    def __init__(self, http: RecordingHTTP, members: int):
+        self.id = GUILD
+        self.me = None
+        everyone = FakeRole(self, GUILD)
+        self.members = {mid: FakeMember(http, mid, everyone) for mid in range(1000, 1000 + members)}
+        self.roles: dict[int, FakeRole] = {}
+        self.channels = {cid: FakeChannel(http, cid) for cid in (PANEL_CHANNEL, LEGACY_CHANNEL)}
+        self.text_channels = list(self.channels.values())
+
+    def get_role(self, role_id: int):
+        return self.roles.get(role_id)
+
+    def get_member(self, member_id: int):
+        return self.members.get(member_id)
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+
+class ReconcileBot:
+    def __init__(self, guild: FakeGuild):
+        self.guild = guild
+        self.user = SimpleNamespace(id=1)
+
+    def get_guild(self, guild_id: int):
+        return self.guild if guild_id == GUILD else None
+
+    async def wait_until_ready(self) -> None:
+        return None
+
+
+def seed(http: RecordingHTTP, panels: int, members: int, rnd: random.Random):
+    """Panneaux + réactions ; rôles volontairement désynchronisés. Retourne l'état attendu."""
+    guild = FakeGuild(http, members)
+    store = rr.get_store()
+    expected: dict[int, set[int]] = {mid: set() for mid in guild.members}
+    shared = 500   # rôle du premier emoji, commun aux panneaux 0 et 1 : jamais retiré
+    for p in range(panels):
+        mid = 10 ** 12 + p
+        roles = [shared if p < 2 and k == 0 else 1000 * (p + 1) + k for k in range(len(EMOJIS))]
+        legacy = p in (3, 4)
+        channel = guild.channels[LEGACY_CHANNEL if legacy else PANEL_CHANNEL]
+        store.add_panel(mid, GUILD, None if legacy else channel.id, dict(zip(EMOJIS, roles)))
+        if p in (4, 5):
+            continue   # message supprimé pendant l'absence du bot (4 : panneau migré)
+        reactions = []
+        for emoji, rid in zip(EMOJIS, roles):
+            guild.roles.setdefault(rid, FakeRole(guild, rid))
+            users = [uid for uid in guild.members if rnd.random() < 0.3]
+            reactions.append(FakeReaction(http, emoji, [1, *users]))
+            for uid in users:
+                expected[uid].add(rid)
+        channel.messages[mid] = SimpleNamespace(id=mid, reactions=reactions)
+
+    # dérive : ~15 % des (membre, rôle) inversés ; le rôle partagé n'est qu'ajouté
+    for uid, member in guild.members.items():
+        held = {rid for rid in expected[uid] if rnd.random() > 0.15}
+        held |= {rid for rid in guild.roles if rnd.random() < 0.02}
+        member.roles = [member.roles[0], *(guild.roles[rid] for rid in held)]
+        if shared in held:
+            expected[uid].add(shared)
+    rr.close_store()   # le cog relit les panneaux depuis la base
+    return guild, expected
+
+
+def new_cog(bot: ReconcileBot) -> rr.ReactionRolesWizard:
+    cog = rr.ReactionRolesWizard(bot)
+    cog.roles.window = 0.005
+    cog.reconciler.pause = 0
+    cog.reconciler.interval = 0
+    return cog
+
+
+async def run(panels: int, members: int) -> int:
+    failures = 0
+    http = RecordingHTTP(latency=0.0)
+    guild, expected = seed(http, panels, members, random.Random(0))
+    bot = ReconcileBot(guild)
+
+    # 1re passe interrompue (arrêt du bot) à mi-parcours
+    cog = new_cog(bot)
+    cog.reconciler.start()
+    while cog.reconciler.panels < panels // 2:
+        await asyncio.sleep(0.001)
+    await cog.cog_unload()
+    first = cog.reconciler.panels
+    calls_first = http.total
+
+    # redémarrage : reprise sur les panneaux restants ; le dernier échoue une fois
+    failing = 10 ** 12 + panels - 1
+    guild.channels[PANEL_CHANNEL].fail_once.add(failing)
+    cog = new_cog(bot)
+    pending = len(rr.get_store().reconcile_pending(rr.get_store().reconcile_run(0)))
+    cog.reconciler.start()
+    await cog.reconciler._task
+    rc = cog.reconciler
+    left = rr.get_store().reconcile_pending(rr.get_store().reconcile_run(0))
+    if left != [failing]:
+        print(f"✗ après échec, en attente : {left}")
+        failures += 1
+    await cog.cog_unload()
+    cog = new_cog(bot)   # passe suivante : seul le panneau en échec
+    cog.reconciler.start()
+    await cog.reconciler._task
+    print(f"passe 1 : {first} panneau(x), {calls_first} appels REST ; "
+          f"reprise : {pending} en attente, {rc.panels} vérifié(s), {http.total - calls_first} appels REST")
+    print(f"corrections : +{rc.added} / -{rc.removed}, panneau(x) disparu(s) : {rc.dropped}")
+    if pending >= panels:
+        print("✗ la reprise a tout recommencé")
+        failures += 1
+
+    actual = {uid: {r.id for r in m.roles if not r.is_default()} for uid, m in guild.members.items()}
+    wrong = sum(actual[uid] != expected[uid] for uid in guild.members)
+    if wrong:
+        print(f"✗ {wrong} membre(s) aux rôles incorrects")
+        failures += 1
+    if cog.reconciler.panels != 1:
+        print(f"✗ passe suivante : {cog.reconciler.panels} panneau(x) au lieu de 1")
+        failures += 1
+    if {10 ** 12 + 4, 10 ** 12 + 5} & rr.PANELS.keys() or rr.PANELS[10 ** 12 + 3]["channel_id"] != LEGACY_CHANNEL:
+        print("✗ panneau disparu gardé ou salon du panneau migré non retrouvé")
+        failures += 1
+    if rr.get_store().reconcile_pending(rr.get_store().reconcile_run(0)):
+        print("✗ panneaux non marqués")
+        failures += 1
+    await cog.cog_unload()
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--panels", type=int, default=40)
+    parser.add_argument("--members", type=int, default=300)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        failures = asyncio.run(run(args.panels, args.members))
+        print("ok" if not failures else f"{failures} échec(s)")
+        return 1 if failures else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
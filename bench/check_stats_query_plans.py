@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# bench/check_stats_query_plans.py
+"""
+Vérifie que les requêtes des commandes stats utilisent les index
+(EXPLAIN QUERY PLAN), après migration d'une base à l'ancien format.
+
+    python bench/check_stats_query_plans.py
+"""
+import sqlite3
+import sys
+from contextlib import closing
+
+from fakes import chdir_tmp
+
+from cogs import stats_store as st
+
+LEGACY_ROWS = [
+    (1, 10, "VALORANT", 3600), (1, 10, "Valorant", 600), (1, 11, "valorant™", 60),
+    (1, 10, "Minecraft", 1200), (2, 12, "Minecraft ", 30),
+]
+
+# (nom, requête, paramètres, motifs attendus dans le plan, motifs interdits)
+CHECKS = [
+    ("recherche de jeu", st.FIND_GAME_SQL, ("valorant", "valorant"),
+     ["USING INDEX idx_games_norm"], ["SCAN games"]),
+    ("stats-jeu", st.GAME_PLAYERS_SQL, (1, 1),
+     ["USING COVERING INDEX idx_game_stats_game", "SEARCH n USING PRIMARY KEY (guild_id=? AND member_id=?)"],
+     ["SCAN game_stats", "TEMP B-TREE"]),
+    ("top-jeux", st.TOP_GAMES_SQL, (1, 25),
+     ["idx_totals_rank"], ["SCAN game_stats", "TEMP B-TREE"]),
+    ("stats-moi", st.MEMBER_RANKS_SQL, (1, 10),
+     ["game_stats USING PRIMARY KEY (guild_id=? AND member_id=?)",
+      "COVERING INDEX idx_game_stats_game (guild_id=? AND game_id=? AND seconds>?)",
+      "SEARCH t USING PRIMARY KEY (guild_id=? AND game_id=?)"], ["SCAN game_stats"]),
+    ("top-jeux 12 mois", st.PERIOD_TOP_GAMES_SQL, {"guild": 1, "month": 202501, "day": 20250101, "limit": 10},
+     ["COVERING INDEX idx_monthly_game", "COVERING INDEX idx_daily_game"], ["SCAN playtime"]),
+    ("stats-moi 30 jours", st.PERIOD_MEMBER_GAMES_SQL, {"guild": 1, "member": 10, "month": 999999, "day": 20250101},
+     ["COVERING INDEX idx_monthly_member", "COVERING INDEX idx_daily_member"], ["SCAN playtime"]),
+    ("stats-jeu 7 jours", st.PERIOD_GAME_PLAYERS_SQL, {"guild": 1, "game": 1, "month": 999999, "day": 20250101},
+     ["COVERING INDEX idx_monthly_game", "COVERING INDEX idx_daily_game"], ["SCAN playtime"]),
+]
+
+
+def main() -> int:
+    tmp = chdir_tmp()
+    try:
+        with closing(sqlite3.connect("stats.db")) as conn, conn:
+            conn.execute("CREATE TABLE game_stats (guild_id INTEGER NOT NULL, member_id INTEGER NOT NULL, "
+                         "game TEXT NOT NULL, seconds INTEGER NOT NULL DEFAULT 0, "
+                         "PRIMARY KEY (guild_id, member_id, game))")
+            conn.executemany("INSERT INTO game_stats VALUES (?, ?, ?, ?)", LEGACY_ROWS)
+
+        failures = 0
+        with closing(st.open_db("stats.db")) as conn:
+            games = conn.execute("SELECT id, name, norm FROM games ORDER BY id").fetchall()
+            stats = conn.execute("SELECT guild_id, member_id, game_id, seconds FROM game_stats ORDER BY 1, 2, 3").fetchall()
+            print("jeux   :", games)
+            print("stats  :", stats)
+            if len(games) != 2 or (1, 10, 1, 4200) not in stats:
+                print("✗ migration : jeux non fusionnés")
+                failures += 1
+            totals = conn.execute("SELECT guild_id, game_id, seconds, players FROM guild_game_totals "
+                                  "ORDER BY 1, 2").fetchall()
+            expected = conn.execute("SELECT guild_id, game_id, SUM(seconds), COUNT(*) FROM game_stats "
+                                    "GROUP BY 1, 2 ORDER BY 1, 2").fetchall()
+            if totals != expected:
+                print("✗ rollup : guild_game_totals diverge de game_stats", totals, expected)
+                failures += 1
+            conn.execute("ANALYZE")
+            for name, sql, args, expected, forbidden in CHECKS:
+                plan = " | ".join(st.query_plan(conn, sql, args))
+                ok = all(e in plan for e in expected) and not any(f in plan for f in forbidden)
+                failures += not ok
+                print(f"{'✓' if ok else '✗'} {name:<18} {plan}")
+        return 1 if failures else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
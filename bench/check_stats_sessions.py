@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# bench/check_stats_sessions.py
+"""
+Sessions de jeu et crash : N sessions ouvertes, flush (point de contrôle),
+arrêt brutal puis redémarrage et réconciliation avec les présences.
+Mesure aussi le coût d'un flush selon le nombre de sessions ouvertes et vérifie
+que les noms d'affichage ne sont écrits qu'une fois.
+
+    python bench/check_stats_sessions.py --sessions 2000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+import discord
+
+from fakes import chdir_tmp
+
+from cogs.stats import StatsCog
+
+GUILD = 1
+
+
+class SessionBot:
+    def __init__(self):
+        self.guild = SimpleNamespace(id=GUILD, members=[], get_member=lambda mid: self.members.get(mid))
+        self.members: dict[int, SimpleNamespace] = {}
+        self.guilds = [self.guild]
+
+    def get_guild(self, guild_id: int):
+        return self.guild if guild_id == GUILD else None
+
+    def play(self, member_id: int, game):
+        activities = [discord.Activity(type=discord.ActivityType.playing, name=game)] if game else []
+        member = SimpleNamespace(id=member_id, bot=False, guild=self.guild, activities=activities,
+                                 display_name=f"Joueur {member_id}")
+        self.members[member_id] = member
+        self.guild.members = list(self.members.values())
+        return member
+
+
+async def total(cog: StatsCog) -> int:
+    return (await cog.db.read("SELECT COALESCE(SUM(seconds), 0) FROM game_stats"))[0][0]
+
+
+async def run(n: int) -> int:
+    failures = 0
+    bot = SessionBot()
+    cog = StatsCog(bot)
+    cog._saved = await cog.db.load_sessions()
+    await cog.on_ready()
+    start = time.time() - 600
+    for mid in range(n):
+        cog._track(bot.play(mid, "Valorant"), start)
+
+    t0 = time.perf_counter()
+    await cog.flush_playtime()
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await cog.flush_playtime()
+    steady = time.perf_counter() - t0
+    print(f"flush avec {n} sessions : ouverture {first * 1000:.1f} ms, régime {steady * 1000:.1f} ms "
+          f"(aucune écriture de session)")
+    names = (await cog.db.read("SELECT COUNT(*) FROM members"))[0][0]
+    for mid in range(n):   # présences répétées : noms inchangés, rien à réécrire
+        cog._track(bot.play(mid, "Valorant"), time.time())
+    if names != n or cog._names_pending:
+        print(f"✗ noms : {names} enregistrés, {len(cog._names_pending)} réécrits")
+        failures += 1
+    credited = await total(cog)
+    if abs(credited - 600 * n) > n:
+        print(f"✗ crédité {credited} s, attendu ~{600 * n} s")
+        failures += 1
+
+    # arrêt brutal : pas de cog_unload, le tampon éventuel est perdu
+    checkpoint, saved = await cog.db.load_sessions()
+    cog.db.close()
+    print(f"point de contrôle : {len(saved)} sessions, il y a {time.time() - checkpoint:.1f} s")
+
+    # redémarrage 5 min plus tard (simulé) : 1/2 joue encore, 1/4 a changé de jeu, 1/4 a arrêté
+    bot2 = SessionBot()
+    for mid in range(n):
+        bot2.play(mid, "Valorant" if mid % 2 == 0 else ("Minecraft" if mid % 4 == 1 else None))
+    cog2 = StatsCog(bot2)
+    cog2._saved = (checkpoint - 300, saved)
+    before = await total(cog2)
+    await cog2.on_ready()
+    await cog2.flush_playtime()
+    rows = await cog2.db.read("SELECT game, COUNT(*) FROM open_sessions GROUP BY game ORDER BY game")
+    print("sessions après réconciliation :", rows)
+    resumed = await total(cog2) - before
+    if rows != [("Minecraft", n // 4), ("Valorant", n // 2)]:
+        print("✗ réconciliation")
+        failures += 1
+    if abs(resumed - 300 * (n // 2)) > n:
+        print(f"✗ écart repris {resumed} s, attendu ~{300 * (n // 2)} s")
+        failures += 1
+    await cog2.cog_unload()
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=2000)
+    args = parser.parse_args()
+    tmp = chdir_tmp()
+    try:
+        failures = asyncio.run(run(args.sessions))
+        print("ok" if not failures else f"{failures} échec(s)")
+        return 1 if failures else 0
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
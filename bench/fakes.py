@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# bench/fakes.py
+"""
+Doublures hors-ligne pour les benchs : bot, messages et interactions Discord
+dont chaque appel REST est compté par ``RecordingHTTP`` (latence simulée).
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("BOT_TOKEN", "bench")
+
+
+class RecordingHTTP:
+    """Compte les appels REST par route et simule une latence (gaussienne)."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.015, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls: Counter = Counter()
+        self._rnd = random.Random(seed)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    async def request(self, route: str) -> None:
+        self.calls[route] += 1
+        if self.latency:
+            await asyncio.sleep(max(0.0, self._rnd.gauss(self.latency, self.jitter)))
+
+
+class FakeMessage:
+    def __init__(self, http: RecordingHTTP, channel_id: int, message_id: int):
+        self.http = http
+        self.channel_id = channel_id
+        self.id = message_id
+        self.edits: list[dict] = []
+
+    async def edit(self, **fields):
+        await self.http.request("PATCH /channels/{c}/messages/{m}")
+        self.edits.append(fields)
+        return self
+
+
+class FakeChannel:
+    def __init__(self, http: RecordingHTTP, channel_id: int):
+        self.http = http
+        self.id = channel_id
+        self.messages: dict[int, FakeMessage] = {}
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return self.messages.setdefault(message_id, FakeMessage(self.http, self.id, message_id))
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self.http.request("GET /channels/{c}/messages/{m}")
+        return self.get_partial_message(message_id)
+
+
+class FakeBot:
+    def __init__(self, http: RecordingHTTP):
+        self.http = http
+        self.channels: dict[int, FakeChannel] = {}
+        self.views: list = []
+
+    def get_partial_messageable(self, channel_id: int) -> FakeChannel:
+        return self.channels.setdefault(channel_id, FakeChannel(self.http, channel_id))
+
+    def get_channel(self, channel_id: int):
+        return None   # pas de cache : force les chemins "sans fetch"
+
+    def get_user(self, user_id: int):
+        return None
+
+    def add_view(self, view, *, message_id=None) -> None:
+        self.views.append((view, message_id))
+
+    async def wait_until_ready(self) -> None:
+        return None
+
+
+class FakeResponse:
+    def __init__(self, http: RecordingHTTP):
+        self.http = http
+        self._done = False
+        self.sent: list[str] = []
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, **_):
+        await self.http.request("POST /interactions/{i}/callback")
+        self._done = True
+        self.sent.append(content)
+
+    async def defer(self, **_):
+        await self.http.request("POST /interactions/{i}/callback")
+        self._done = True
+
+
+class FakeInteraction:
+    def __init__(self, http: RecordingHTTP, user_id: int):
+        self.user = SimpleNamespace(id=user_id, display_name=f"user{user_id}", display_avatar=None)
+        self.response = FakeResponse(http)
+
+
+def chdir_tmp() -> tempfile.TemporaryDirectory:
+    """Isole data/*.db dans un dossier temporaire (à garder vivant pendant le bench)."""
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)
+    return tmp
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# bench/polls_load.py
+"""
+Test de charge hors-ligne du cog Polls : N votants simulés cliquent sur
+``PollButton.callback`` (choix unique et multiples) contre une couche HTTP
+enregistreuse. Rapporte le débit, les appels REST par vote et la latence
+de la boucle asyncio.
+
+    python bench/polls_load.py --voters 2000 --clicks 3 --latency 0.05
+    python bench/polls_load.py --json > bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fakes import FakeBot, FakeInteraction, RecordingHTTP, chdir_tmp, percentile
+
+from cogs.polls import Choice, Polls, PollState, PollView
+
+LAG_TICK = 0.005  # période de l'échantillonneur de latence de boucle
+
+
+class LoopLagProbe:
+    """Mesure le retard de réveil d'une tâche qui dort LAG_TICK en boucle."""
+
+    def __init__(self):
+        self.samples: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(LAG_TICK)
+            self.samples.append(max(0.0, time.perf_counter() - t0 - LAG_TICK))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+
+async def run_mode(args, multi: bool) -> dict:
+    http = RecordingHTTP(latency=args.latency, jitter=args.latency * 0.3, seed=args.seed)
+    bot = FakeBot(http)
+    cog = Polls(bot)
+    await cog.cog_load()
+
+    state = PollState(
+        question="Charge ?", choices=[Choice(label=f"Choix {i}") for i in range(args.choices)],
+        author_id=0, end_time=None, channel_id=1, message_id=1, allow_multi=multi,
+    )
+    cog._sessions[1] = state
+    view = PollView(cog, state)
+    cog._views[1] = view
+    buttons = view.children
+
+    rnd = random.Random(args.seed)
+    sem = asyncio.Semaphore(args.concurrency)
+    acks: list[float] = []
+
+    async def voter(uid: int) -> None:
+        for _ in range(args.clicks):
+            async with sem:
+                inter = FakeInteraction(http, uid)
+                t0 = time.perf_counter()
+                await buttons[rnd.randrange(args.choices)].callback(inter)
+                acks.append(time.perf_counter() - t0)
+
+    probe = LoopLagProbe()
+    probe.start()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(voter(10**17 + uid) for uid in range(args.voters)))
+    elapsed = time.perf_counter() - t0
+    await asyncio.sleep(cog.renderer.window + 0.1)   # dernier rendu regroupé
+    probe.stop()
+    assert state.check_tallies(), "compteurs incohérents"
+    renders = dict(cog.renderer.stats)
+    limited = cog.limiter.limited
+    await cog.cog_unload()
+
+    votes = len(acks)
+    return {
+        "mode": "multi" if multi else "unique",
+        "votes": votes,
+        "seconds": round(elapsed, 3),
+        "votes_per_s": round(votes / elapsed, 1),
+        "rest_calls": dict(http.calls),
+        "rest_per_vote": round(http.total / votes, 3),
+        "ack_p50_ms": round(percentile(acks, 0.5) * 1000, 2),
+        "ack_p99_ms": round(percentile(acks, 0.99) * 1000, 2),
+        "loop_lag_p99_ms": round(percentile(probe.samples, 0.99) * 1000, 2),
+        "loop_lag_max_ms": round(max(probe.samples, default=0.0) * 1000, 2),
+        "renders": renders,
+        "rate_limited": limited,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--clicks", type=int, default=3, help="clics par votant")
+    parser.add_argument("--choices", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence HTTP simulée (s)")
+    parser.add_argument("--mode", choices=("unique", "multi", "both"), default="both")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="sortie JSON (suivi de régressions)")
+    args = parser.parse_args()
+
+    modes = {"unique": [False], "multi": [True], "both": [False, True]}[args.mode]
+    tmp = chdir_tmp()
+    try:
+        results = [asyncio.run(run_mode(args, multi)) for multi in modes]
+    finally:
+        tmp.cleanup()
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    for r in results:
+        print(f"[{r['mode']}] {r['votes']} votes en {r['seconds']} s → {r['votes_per_s']} votes/s")
+        print(f"    REST/vote={r['rest_per_vote']}  {r['rest_calls']}")
+        print(f"    ack p50={r['ack_p50_ms']} ms p99={r['ack_p99_ms']} ms  "
+              f"lag boucle p99={r['loop_lag_p99_ms']} ms max={r['loop_lag_max_ms']} ms")
+        print(f"    rendus {r['renders']}  clics freinés={r['rate_limited']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# cogs/emoji_table.py
+"""
+Table des émojis Unicode embarquée (cogs/emoji_table.txt) : validation locale
+des émojis du Reaction Roles, sans message de test côté Discord.
+
+La table contient les séquences « fully-qualified » d'emoji-test.txt (UTS #51),
+une par ligne. Pour la régénérer avec une version plus récente d'Unicode :
+
+    python -m cogs.emoji_table chemin/vers/emoji-test.txt
+"""
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, Optional
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "emoji_table.txt")
+
+# sélecteurs de variation et espaces invisibles ; le ZWJ (U+200D) est gardé :
+# il fait partie de la séquence (👨‍👩‍👧 ≠ 👨👩👧)
+INVISIBLES = "\uFE0F\uFE0E\u200C\u200B\u2060\u00A0"
+ZWJ = "\u200D"
+
+
+def sanitize_unicode_emoji(s: str) -> str:
+    return "".join(ch for ch in s if ch not in INVISIBLES).strip()
+
+
+@lru_cache(maxsize=1)
+def _table() -> Dict[str, str]:
+    """forme nettoyée -> forme fully-qualified (celle qu'attend Discord)."""
+    with open(TABLE_PATH, "r", encoding="utf-8") as f:
+        return {sanitize_unicode_emoji(line.rstrip("\n")): line.rstrip("\n")
+                for line in f if line.strip() and not line.startswith("# ")}
+
+
+def zwj_sequences() -> Dict[str, str]:
+    """Séquences ZWJ nettoyées, indexées par leur forme sans ZWJ (ancien nettoyage)."""
+    return {key.replace(ZWJ, ""): key for key in _table() if ZWJ in key}
+
+
+def qualified_emoji(s: str) -> Optional[str]:
+    """Forme fully-qualified de ``s``, ou None si absent de la table (inconnu ou plus récent)."""
+    return _table().get(sanitize_unicode_emoji(s))
+
+
+def build(source: str, dest: str = TABLE_PATH) -> int:
+    version = "?"
+    seqs = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("# Version:"):
+                version = line.split(":", 1)[1].strip()
+            head, sep, _ = line.partition("; fully-qualified")
+            if not sep or line.startswith("#"):
+                continue
+            seqs.append("".join(chr(int(cp, 16)) for cp in head.split()))
+    keys = {sanitize_unicode_emoji(s) for s in seqs}
+    if len(keys) != len(seqs):
+        raise SystemExit("❌ Deux séquences ont la même forme nettoyée")
+    with open(dest, "w", encoding="utf-8", newline="\n") as out:
+        out.write(f"# Émojis Unicode {version} (fully-qualified), générés par cogs/emoji_table.py\n")
+        out.writelines(s + "\n" for s in seqs)
+    return len(seqs)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit("usage : python -m cogs.emoji_table emoji-test.txt")
+    print(f"✅ {build(sys.argv[1])} émojis → {TABLE_PATH}")
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# cogs/poll_store.py
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DB_PATH = os.path.join("data", "polls.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS polls (
+    message_id  INTEGER PRIMARY KEY,
+    channel_id  INTEGER NOT NULL,
+    author_id   INTEGER NOT NULL,
+    question    TEXT    NOT NULL,
+    choices     TEXT    NOT NULL,              -- JSON [[label, emoji|null], ...]
+    allow_multi INTEGER NOT NULL DEFAULT 0,
+    end_time    REAL,                          -- timestamp UTC (NULL = sans fin)
+    closed      INTEGER NOT NULL DEFAULT 0,
+    rate_burst  INTEGER,                       -- limiteur de clics (NULL = défaut)
+    rate_per_s  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_polls_open ON polls (closed);
+
+CREATE TABLE IF NOT EXISTS poll_votes (
+    message_id INTEGER NOT NULL,
+    user_id    INTEGER NOT NULL,
+    value      INTEGER NOT NULL,               -- index (unique) ou masque de bits (multi)
+    PRIMARY KEY (message_id, user_id)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_VOTE = """
+INSERT INTO poll_votes (message_id, user_id, value) VALUES (?, ?, ?)
+ON CONFLICT(message_id, user_id) DO UPDATE SET value = excluded.value
+"""
+_DELETE_VOTE = "DELETE FROM poll_votes WHERE message_id = ? AND user_id = ?"
+
+
+class PollStore:
+    """
+    Stockage SQLite (WAL) des sondages.
+    Les votes sont tamponnés en mémoire (write-behind) puis écrits par lots
+    dans une seule transaction via ``flush()`` — jamais une écriture par clic.
+    Les méthodes sont synchrones : côté cog, on les appelle via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()          # connexion partagée
+        self._pending_lock = threading.Lock()  # tampon des votes
+        # (message_id, user_id) -> valeur, ou None pour supprimer le vote
+        self._pending: Dict[Tuple[int, int], Optional[int]] = {}
+
+    def _migrate(self) -> None:
+        cols = {row[1] for row in self._conn.execute("PRAGMA table_info(polls)")}
+        with self._conn:
+            if "rate_burst" not in cols:
+                self._conn.execute("ALTER TABLE polls ADD COLUMN rate_burst INTEGER")
+            if "rate_per_s" not in cols:
+                self._conn.execute("ALTER TABLE polls ADD COLUMN rate_per_s REAL")
+
+    # ------------------------------ Votes ------------------------------ #
+
+    def record_vote(self, message_id: int, user_id: int, value: Optional[int]) -> None:
+        """Tamponne un vote (None = retrait). Aucun accès disque ici."""
+        with self._pending_lock:
+            self._pending[(message_id, user_id)] = value
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Écrit tous les votes en attente dans une transaction. Retourne leur nombre."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        upserts = [(m, u, v) for (m, u), v in batch.items() if v is not None]
+        deletes = [(m, u) for (m, u), v in batch.items() if v is None]
+        try:
+            with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+                if upserts:
+                    cur.executemany(_UPSERT_VOTE, upserts)
+                if deletes:
+                    cur.executemany(_DELETE_VOTE, deletes)
+        except Exception:
+            # lot remis en attente ; un vote plus récent du même utilisateur l'emporte
+            with self._pending_lock:
+                self._pending = {**batch, **self._pending}
+            raise
+        return len(batch)
+
+    # ----------------------------- Sondages ---------------------------- #
+
+    def save_poll(self, message_id: int, channel_id: int, author_id: int, question: str,
+                  choices: Iterable[Tuple[str, Optional[str]]], allow_multi: bool,
+                  end_time: Optional[float], rate_burst: Optional[int] = None,
+                  rate_per_s: Optional[float] = None) -> None:
+        with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+            cur.execute(
+                """
+                INSERT OR REPLACE INTO polls
+                    (message_id, channel_id, author_id, question, choices, allow_multi, end_time, closed,
+                     rate_burst, rate_per_s)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+                """,
+                (message_id, channel_id, author_id, question,
+                 json.dumps([list(c) for c in choices], ensure_ascii=False),
+                 int(allow_multi), end_time, rate_burst, rate_per_s),
+            )
+
+    def mark_closed(self, message_id: int) -> None:
+        self.flush()
+        with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+            cur.execute("UPDATE polls SET closed = 1 WHERE message_id = ?", (message_id,))
+
+    def load_open(self) -> List[Tuple[tuple, Dict[int, int]]]:
+        """Sondages non clôturés + leurs votes : [(ligne polls, {user_id: value})]."""
+        with self._lock, closing(self._conn.cursor()) as cur:
+            polls = cur.execute(
+                """
+                SELECT message_id, channel_id, author_id, question, choices, allow_multi, end_time,
+                       rate_burst, rate_per_s
+                FROM polls WHERE closed = 0
+                """
+            ).fetchall()
+            votes: Dict[int, Dict[int, int]] = {row[0]: {} for row in polls}
+            cur.execute(
+                """
+                SELECT v.message_id, v.user_id, v.value
+                FROM poll_votes v JOIN polls p ON p.message_id = v.message_id
+                WHERE p.closed = 0
+                """
+            )
+            for mid, uid, value in cur:
+                votes[mid][uid] = value
+        return [(row[:4] + (json.loads(row[4]),) + row[5:], votes[row[0]]) for row in polls]
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -2,15 +2,25 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import heapq
+import logging
+import os
+import sys
+import time
 import unicodedata
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple, Union
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from config import GUILD_ID
+from cogs.poll_store import PollStore
+
+log = logging.getLogger("polls")
 
 # =========================
 #           CONFIG
@@ -21,6 +31,26 @@ MAX_QUESTION_LENGTH = 256
 MAX_CHOICE_LENGTH = 100
 MAX_TIMEOUT_MINUTES = 7 * 24 * 60  # 1 semaine
 
+# au plus 1 édition d'embed par sondage et par fenêtre (secondes)
+RENDER_WINDOW_SECONDS = 2.0
+# écriture différée des votes en base (secondes)
+VOTE_FLUSH_SECONDS = 2.0
+# anti-spam des boutons : seau à jetons par (sondage, utilisateur)
+VOTE_RATE_BURST = 4            # clics d'affilée autorisés
+VOTE_RATE_PER_SECOND = 0.5     # jetons regagnés par seconde
+VOTE_LIMITER_MAX_ENTRIES = 50_000  # seaux gardés en mémoire (LRU)
+# réglages proposés à la création : clé -> (libellé, rafale, jetons/s, description)
+VOTE_RATE_PRESETS = {
+    "normal": ("Anti-spam normal", VOTE_RATE_BURST, VOTE_RATE_PER_SECOND, "4 clics d'affilée, puis 1 toutes les 2 s"),
+    "strict": ("Anti-spam strict", 2, 0.2, "2 clics d'affilée, puis 1 toutes les 5 s"),
+    "souple": ("Anti-spam souple", 10, 2.0, "10 clics d'affilée, puis 2 par seconde"),
+}
+# cycle de vie : un sondage clôturé reste en mémoire ce délai, puis n'en garde qu'un résumé
+CLOSED_GRACE_SECONDS = 10 * 60
+ARCHIVE_MAX = 200  # résumés de sondages clôturés gardés en mémoire
+# contrôle des compteurs de votes par recompte complet à chaque lecture (debug, coûteux)
+POLL_TALLY_CHECK = os.getenv("POLL_TALLY_CHECK", "0") == "1"
+
 # ====== THEME / STYLE ======
 THEMES = {
     "gamer": {
@@ -74,36 +104,51 @@ def fmt_remaining(seconds: int) -> str:
     return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
 
 
-def make_bar(pct: float, size: int = BAR_SIZE) -> str:
+def make_bar(pct: float, size: int = BAR_SIZE, style: Optional[str] = None) -> str:
     """
     Trois styles :
     - gradient : remplissage fin (▉ + demi-segments), encadré par ┃ ┃, rendu monospace entre backticks
     - emoji    : rampes 🟩🟨🟧🟥 + ▫️ en vide
     - glass    : ▰▱ avec curseur ◈ qui se déplace (look "verre")
+    Le pourcentage est réduit aux quelques états visibles du style, puis le
+    rendu est servi par un cache borné.
     """
     pct = max(0.0, min(1.0, pct))
+    style = style or BAR_STYLE
 
-    if BAR_STYLE == "emoji":
+    if style == "emoji":
         filled = int(round(pct * size))
         idx = min(int(pct * (len(_EMOJI_FILL) - 1)), len(_EMOJI_FILL) - 1)
-        fill_token = _EMOJI_FILL[idx]
-        return fill_token * filled + _EMOJI_EMPTY * (size - filled)
+        return _render_bar("emoji", size, (filled, idx))
 
-    if BAR_STYLE == "glass":
+    if style == "glass":
         filled = int(pct * size)
         cursor_pos = min(size - 1, max(0, int(round(pct * (size - 1)))))
-        body = list("▱" * size)
-        for i in range(filled):
-            body[i] = "▰"
-        body[cursor_pos] = "◈"
-        return f"{BORDER_LEFT}{''.join(body)}{BORDER_RIGHT}"
+        return _render_bar("glass", size, (filled, cursor_pos))
 
     # style "gradient" par défaut
     exact = pct * size
     whole = int(exact)                      # segments pleins
     remainder = exact - whole               # fraction pour demi-segment
     partial_idx = min(int(remainder * (len(_PARTIALS))), len(_PARTIALS) - 1)
+    return _render_bar("gradient", size, (whole, partial_idx))
 
+
+@lru_cache(maxsize=1024)
+def _render_bar(style: str, size: int, state: Tuple[int, int]) -> str:
+    if style == "emoji":
+        filled, idx = state
+        return _EMOJI_FILL[idx] * filled + _EMOJI_EMPTY * (size - filled)
+
+    if style == "glass":
+        filled, cursor_pos = state
+        body = list("▱" * size)
+        for i in range(filled):
+            body[i] = "▰"
+        body[cursor_pos] = "◈"
+        return f"{BORDER_LEFT}{''.join(body)}{BORDER_RIGHT}"
+
+    whole, partial_idx = state
     bar = "█" * whole
     if partial_idx > 0 and whole < size:
         bar += _PARTIALS[partial_idx]
@@ -114,6 +159,35 @@ def make_bar(pct: float, size: int = BAR_SIZE) -> str:
     return f"{BORDER_LEFT}{bar}{BORDER_RIGHT}"
 
 
+@lru_cache(maxsize=4096)
+def running_field(label: str, emoji: Optional[Union[str, discord.PartialEmoji]],
+                  count: int, total: int, style: str) -> Tuple[str, str]:
+    """(name, value) d'un champ d'embed de sondage en cours."""
+    pct = (count / total) if total > 0 else 0.0
+    bar = make_bar(pct, style=style)
+    pct_txt = f"{int(round(pct * 100)):>3d}%"
+    badge = "🟢" if pct >= 0.66 else ("🟠" if pct >= 0.33 else "⚪")
+    prefix = f"{emoji} " if emoji else ""
+    value = (f"{bar}   **{count}** vote(s) • {badge} {pct_txt}"
+             if style == "emoji"
+             else f"`{bar}`   **{count}** vote(s) • {badge} `{pct_txt}`")
+    return f"{prefix}{label}", value
+
+
+@lru_cache(maxsize=4096)
+def closed_field(rank: int, label: str, emoji: Optional[Union[str, discord.PartialEmoji]],
+                 count: int, total: int, style: str) -> Tuple[str, str]:
+    """(name, value) d'un champ d'embed de résultats."""
+    pct = (count / total) if total > 0 else 0.0
+    bar = make_bar(pct, style=style)
+    pct_txt = f"{int(round(pct * 100)):>3d}%"
+    prefix = f"{emoji} " if emoji else ""
+    value = (f"{bar}   **{count}** vote(s) • {pct_txt}"
+             if style == "emoji"
+             else f"`{bar}`   **{count}** vote(s) • `{pct_txt}`")
+    return f"{medal_for(rank)} {prefix}{label}", value
+
+
 def medal_for(rank: int) -> str:
     return {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, "•")
 
@@ -170,13 +244,17 @@ def parse_choice_line(line: str) -> Tuple[Optional[Union[str, discord.PartialEmo
 # =========================
 
 
-@dataclass
+@dataclass(slots=True)
 class Choice:
     label: str
     emoji: Optional[Union[str, discord.PartialEmoji]] = None
 
 
-@dataclass
+# masques partagés : évite d'allouer un int par votant (> 256 n'est pas mis en cache par CPython)
+_MASKS = tuple(range(1 << MAX_CHOICES))
+
+
+@dataclass(slots=True)
 class PollState:
     question: str
     choices: List[Choice]
@@ -185,28 +263,321 @@ class PollState:
     channel_id: int
     message_id: Optional[int] = None
     allow_multi: bool = False
-    # votes : user -> set d’index si multi, sinon int (index)
+    # cycle de vie : "open" → "closing" → "closed" → "evicted"
+    status: str = "open"
+    # anti-spam propre au sondage
+    rate_burst: int = VOTE_RATE_BURST
+    rate_per_sec: float = VOTE_RATE_PER_SECOND
+    # votes : user -> masque de bits des index si multi, sinon int (index)
     votes_single: Dict[int, int] = field(default_factory=dict)
-    votes_multi: Dict[int, set] = field(default_factory=dict)
+    votes_multi: Dict[int, int] = field(default_factory=dict)
+    # compteurs tenus à jour à chaque vote (lecture O(1) vis-à-vis du nb de votants)
+    _counts: List[int] = field(init=False, repr=False, compare=False)
+    _total: int = field(init=False, default=0, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.recount()
 
     @property
     def counts(self) -> List[int]:
+        if POLL_TALLY_CHECK:
+            self.check_tallies()
+        return list(self._counts)
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def vote_single(self, user_id: int, index: int) -> bool:
+        """Enregistre un vote (choix unique). Retourne True si le vote a changé."""
+        prev = self.votes_single.get(user_id)
+        if prev == index:
+            return False
+        if prev is not None and 0 <= prev < len(self._counts):
+            self._counts[prev] -= 1
+            self._total -= 1
+        self.votes_single[user_id] = index
+        self._counts[index] += 1
+        self._total += 1
+        return True
+
+    def toggle_multi(self, user_id: int, index: int) -> bool:
+        """Ajoute/retire un choix (choix multiples). Retourne True si coché."""
+        mask = self.votes_multi.get(user_id, 0)
+        bit = 1 << index
+        if mask & bit:
+            mask ^= bit         # toggle off
+            self._counts[index] -= 1
+            self._total -= 1
+            if mask:
+                self.votes_multi[user_id] = _MASKS[mask]
+            else:
+                del self.votes_multi[user_id]
+            return False
+        self.votes_multi[user_id] = _MASKS[mask | bit]  # toggle on
+        self._counts[index] += 1
+        self._total += 1
+        return True
+
+    def selection(self, user_id: int) -> List[int]:
+        """Index choisis par un utilisateur (triés)."""
+        if self.allow_multi:
+            mask = self.votes_multi.get(user_id, 0)
+            return [i for i in range(len(self.choices)) if mask >> i & 1]
+        idx = self.votes_single.get(user_id)
+        return [] if idx is None else [idx]
+
+    def recount(self) -> List[int]:
+        """Recompte complet (restauration, contrôle) ; remplace les compteurs."""
         c = [0] * len(self.choices)
         if self.allow_multi:
-            for idxs in self.votes_multi.values():
-                for i in idxs:
-                    if 0 <= i < len(c):
-                        c[i] += 1
+            # ≤ 2^10 masques distincts : on les compte puis on répartit par bit
+            for mask, n in Counter(self.votes_multi.values()).items():
+                for i in range(len(c)):
+                    if mask >> i & 1:
+                        c[i] += n
         else:
             for i in self.votes_single.values():
                 if 0 <= i < len(c):
                     c[i] += 1
-        return c
+        self._counts = c
+        self._total = sum(c)
+        return list(c)
+
+    def check_tallies(self) -> bool:
+        """Compare les compteurs incrémentaux à un recompte complet (et les corrige)."""
+        expected = list(self._counts)
+        actual = self.recount()
+        if expected != actual:
+            log.error("Compteurs incohérents pour le sondage %s : %s ≠ %s",
+                      self.message_id, expected, actual)
+            return False
+        return True
+
+    def footprint(self) -> int:
+        """Estimation (octets) de la mémoire occupée par le sondage et ses votes."""
+        votes = self.votes_multi if self.allow_multi else self.votes_single
+        key_size = sys.getsizeof(1 << 60) if votes else 0   # ids Discord (snowflakes)
+        return (sys.getsizeof(self) + sys.getsizeof(votes) + len(votes) * key_size
+                + sum(sys.getsizeof(c) + sys.getsizeof(c.label) for c in self.choices))
+
+    def vote_value(self, user_id: int) -> Optional[int]:
+        """Vote d'un utilisateur pour le stockage : index (unique) ou masque de bits (multi)."""
+        if self.allow_multi:
+            return self.votes_multi.get(user_id) or None
+        return self.votes_single.get(user_id)
+
+@dataclass(slots=True)
+class ArchivedPoll:
+    """Résumé compact d'un sondage clôturé et évincé de la mémoire."""
+    message_id: int
+    question: str
+    labels: Tuple[str, ...]
+    counts: Tuple[int, ...]
+    closed_at: datetime
 
     @property
     def total(self) -> int:
         return sum(self.counts)
 
+    def footprint(self) -> int:
+        return (sys.getsizeof(self) + sys.getsizeof(self.question) + sys.getsizeof(self.labels)
+                + sys.getsizeof(self.counts) + sum(sys.getsizeof(lb) for lb in self.labels))
+
+# =========================
+#        RENDERER
+# =========================
+
+
+class PollRenderer:
+    """
+    Regroupe les MAJ d'embed des sondages.
+    Chaque vote marque le sondage "sale" ; au plus une édition part par fenêtre
+    (``window`` secondes) et par sondage, avec l'état le plus récent.
+    """
+
+    def __init__(self, cog: "Polls", *, window: float = RENDER_WINDOW_SECONDS):
+        self.cog = cog
+        self.window = window
+        self._dirty: Dict[int, PollState] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._last_edit: Dict[int, float] = {}
+        self._last_counts: Dict[int, Tuple[int, ...]] = {}
+        # compteurs
+        self.requested = 0   # demandes de rendu (1 par vote)
+        self.coalesced = 0   # demandes absorbées par un rendu déjà planifié
+        self.skipped = 0     # rendus annulés (rien n'a changé à l'écran)
+        self.sent = 0        # éditions réellement envoyées
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "skipped": self.skipped,
+            "sent": self.sent,
+        }
+
+    def mark_dirty(self, state: PollState) -> None:
+        mid = state.message_id
+        if mid is None:
+            return
+        self.requested += 1
+        self._dirty[mid] = state
+        if mid in self._tasks:
+            self.coalesced += 1
+            return
+        self._tasks[mid] = asyncio.create_task(self._flush_later(mid))
+
+    def forget(self, message_id: Optional[int]) -> None:
+        """Annule tout rendu en attente (ex : sondage clôturé)."""
+        if message_id is None:
+            return
+        self._dirty.pop(message_id, None)
+        self._last_edit.pop(message_id, None)
+        self._last_counts.pop(message_id, None)
+        task = self._tasks.pop(message_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._dirty.clear()
+
+    async def _flush_later(self, mid: int) -> None:
+        try:
+            last = self._last_edit.get(mid)
+            if last is not None:
+                delay = self.window - (time.monotonic() - last)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            state = self._dirty.pop(mid, None)
+            if state is None:
+                return
+            snapshot = tuple(state.counts)
+            if self._last_counts.get(mid) == snapshot:
+                self.skipped += 1
+                return
+            self._last_edit[mid] = time.monotonic()
+            if await self.cog.edit_running(state):
+                self.sent += 1
+                self._last_counts[mid] = snapshot
+        finally:
+            if self._tasks.get(mid) is asyncio.current_task():
+                del self._tasks[mid]
+                # un vote est arrivé pendant l'édition → on replanifie
+                if mid in self._dirty:
+                    self._tasks[mid] = asyncio.create_task(
+                        self._flush_later(mid))
+
+# =========================
+#       RATE LIMITER
+# =========================
+
+
+class VoteRateLimiter:
+    """
+    Seau à jetons par (sondage, utilisateur), gardé dans une LRU bornée :
+    coût constant par clic quel que soit le nombre de votants.
+    """
+
+    def __init__(self, *, max_entries: int = VOTE_LIMITER_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # (message_id, user_id) -> (jetons, dernier passage monotonic)
+        self._buckets: "OrderedDict[Tuple[int, int], Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, message_id: int, user_id: int, burst: int, per_second: float) -> bool:
+        key = (message_id, user_id)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(burst)
+        else:
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * per_second)
+            self._buckets.move_to_end(key)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        else:
+            self.limited += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_entries:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    def forget_poll(self, message_id: int) -> None:
+        for key in [k for k in self._buckets if k[0] == message_id]:
+            del self._buckets[key]
+
+# =========================
+#        SCHEDULER
+# =========================
+
+
+class PollScheduler:
+    """
+    Un seul timer pour toutes les échéances de sondages (tas trié par end_time).
+    Le compte à rebours affiché est un timestamp Discord relatif : aucune
+    édition n'est nécessaire avant la clôture.
+    """
+
+    def __init__(self, cog: "Polls"):
+        self.cog = cog
+        self._heap: List[Tuple[float, int]] = []
+        self._deadlines: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, state: PollState) -> None:
+        if not state.end_time or state.message_id is None:
+            return
+        ts = state.end_time.timestamp()
+        self._deadlines[state.message_id] = ts
+        heapq.heappush(self._heap, (ts, state.message_id))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        elif self._heap[0][1] == state.message_id:
+            self._wakeup.set()   # nouvelle échéance la plus proche
+
+    def cancel(self, message_id: Optional[int]) -> None:
+        # suppression paresseuse : l'entrée du tas sera ignorée
+        if message_id is not None:
+            self._deadlines.pop(message_id, None)
+
+    def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+        self._heap.clear()
+        self._deadlines.clear()
+
+    async def _run(self) -> None:
+        await self.cog.bot.wait_until_ready()
+        while self._heap:
+            ts, mid = self._heap[0]
+            if self._deadlines.get(mid) != ts:
+                heapq.heappop(self._heap)   # annulée ou replanifiée
+                continue
+            delay = ts - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                continue
+            heapq.heappop(self._heap)
+            del self._deadlines[mid]
+            state = self.cog._sessions.get(mid)
+            if state is not None:
+                self.cog.spawn(self.cog.close_poll(state))
+
 # =========================
 #        VOTE UI
 # =========================
@@ -226,6 +597,7 @@ class PollButton(discord.ui.Button):
             label=label_text,
             emoji=valid_emoji,
             row=min(index // 5, 4),
+            custom_id=f"poll:{index}",  # persistant (vue ré-enregistrée au démarrage)
         )
         self.index = index
 
@@ -234,41 +606,32 @@ class PollButton(discord.ui.Button):
         cog: Polls = view.cog
         state: PollState = view.state
 
-        if state.end_time and discord.utils.utcnow() >= state.end_time:
+        if state.status != "open" or (state.end_time and discord.utils.utcnow() >= state.end_time):
             return await interaction.response.send_message("⏰ Le sondage est déjà terminé.", ephemeral=True)
 
         uid = interaction.user.id
-        changed = False
+        # Clics trop rapprochés : ignorés avant tout traitement, accusé de réception
+        # muet (defer) sans message de suivi
+        if state.message_id and not cog.limiter.allow(state.message_id, uid, state.rate_burst, state.rate_per_sec):
+            return await interaction.response.defer()
+
         if state.allow_multi:
-            cur = state.votes_multi.get(uid, set())
-            if self.index in cur:
-                cur.remove(self.index)   # toggle off
-            else:
-                cur.add(self.index)      # toggle on
-            state.votes_multi[uid] = cur
+            state.toggle_multi(uid, self.index)
             changed = True
         else:
-            prev = state.votes_single.get(uid)
-            state.votes_single[uid] = self.index
-            changed = (prev != self.index)
-
-        # MAJ embed
-        channel = cog.bot.get_channel(state.channel_id)
-        if isinstance(channel, (discord.TextChannel, discord.Thread, discord.VoiceChannel)) and state.message_id:
-            try:
-                msg = await channel.fetch_message(state.message_id)
-            except discord.HTTPException:
-                return
-            embed = cog.build_running_embed(state, interaction.user)
-            with contextlib.suppress(discord.HTTPException):
-                await msg.edit(embed=embed)
+            changed = state.vote_single(uid, self.index)
+
+        # MAJ embed (regroupée par le renderer) + écriture différée
+        if changed:
+            cog.renderer.mark_dirty(state)
+            if state.message_id:
+                cog.store.record_vote(state.message_id, uid, state.vote_value(uid))
 
         # Feedback
         ch = state.choices[self.index]
         if changed:
             if state.allow_multi:
-                sel = sorted(state.votes_multi[uid])
-                labels = [state.choices[i].label for i in sel]
+                labels = [state.choices[i].label for i in state.selection(uid)]
                 await interaction.response.send_message(
                     f"✅ Sélection mise à jour : {', '.join(labels) if labels else '—'}",
                     ephemeral=True,
@@ -292,11 +655,8 @@ class PollView(discord.ui.View):
 
     async def on_timeout(self) -> None:
         # sécurité
-        channel = self.cog.bot.get_channel(self.state.channel_id)
-        if isinstance(channel, (discord.TextChannel, discord.Thread, discord.VoiceChannel)) and self.state.message_id:
-            with contextlib.suppress(Exception):
-                msg = await channel.fetch_message(self.state.message_id)
-                await self.cog.finalize_poll(msg, self.state)
+        with contextlib.suppress(Exception):
+            await self.cog.close_poll(self.state)
 
 # =========================
 #        WIZARD UI
@@ -335,6 +695,7 @@ class PollWizard(discord.ui.View):
         self.target_channel: Optional[int] = current_channel.id if current_channel else None
         self.allow_multi: bool = False
         self.num_choices: int = 2
+        self.rate_preset: str = "normal"
 
         # Sélecteur de salon
         self.add_item(ChannelPicker(self, guild, current_channel))
@@ -363,6 +724,16 @@ class PollWizard(discord.ui.View):
         self.count_select.callback = self._on_pick_count  # type: ignore
         self.add_item(self.count_select)
 
+        # Anti-spam des boutons (propre au sondage)
+        self.rate_select = discord.ui.Select(
+            placeholder="Anti-spam des votes (par défaut : normal)",
+            min_values=1, max_values=1,
+            options=[discord.SelectOption(label=label, value=key, description=desc)
+                     for key, (label, _, _, desc) in VOTE_RATE_PRESETS.items()],
+        )
+        self.rate_select.callback = self._on_pick_rate  # type: ignore
+        self.add_item(self.rate_select)
+
         # Continuer
         self.continue_btn = discord.ui.Button(
             label="Continuer ➡️", style=discord.ButtonStyle.success)
@@ -377,14 +748,19 @@ class PollWizard(discord.ui.View):
         self.num_choices = int(self.count_select.values[0])
         await interaction.response.defer()
 
+    async def _on_pick_rate(self, interaction: discord.Interaction):
+        self.rate_preset = self.rate_select.values[0]
+        await interaction.response.defer()
+
     async def _on_continue(self, interaction: discord.Interaction):
         channel_id = self.target_channel or (
             interaction.channel.id if interaction.channel else None)
         if channel_id is None:
             return await interaction.response.send_message("⚠️ Impossible de déterminer le salon.", ephemeral=True)
+        _, burst, per_second, _ = VOTE_RATE_PRESETS[self.rate_preset]
         await interaction.response.send_modal(
             ChoiceModalPart1(self.cog, channel_id,
-                             self.allow_multi, self.num_choices)
+                             self.allow_multi, self.num_choices, (burst, per_second))
         )
 
 # =========================
@@ -398,12 +774,14 @@ class ChoiceModalPart1(discord.ui.Modal, title="Créer un sondage (1/2)"):
     duree = discord.ui.TextInput(
         label="Durée (minutes, optionnel)", required=False, placeholder="Ex : 60")
 
-    def __init__(self, cog: "Polls", channel_id: int, allow_multi: bool, total_choices: int):
+    def __init__(self, cog: "Polls", channel_id: int, allow_multi: bool, total_choices: int,
+                 rate: Tuple[int, float] = (VOTE_RATE_BURST, VOTE_RATE_PER_SECOND)):
         super().__init__(timeout=300)
         self.cog = cog
         self.channel_id = channel_id
         self.allow_multi = allow_multi
         self.total_choices = total_choices
+        self.rate = rate
         self.choice_inputs: List[discord.ui.TextInput] = []
         first_batch = min(5, total_choices)
         for i in range(first_batch):
@@ -438,17 +816,18 @@ class ChoiceModalPart1(discord.ui.Modal, title="Créer un sondage (1/2)"):
         if remaining > 0:
             await interaction.response.send_modal(
                 ChoiceModalPart2(
-                    self.cog, self.channel_id, self.allow_multi, q, d_minutes, collected, remaining)
+                    self.cog, self.channel_id, self.allow_multi, q, d_minutes, collected, remaining, self.rate)
             )
         else:
             await self.cog.create_poll_from_inputs(
-                interaction, self.channel_id, self.allow_multi, q, d_minutes, collected
+                interaction, self.channel_id, self.allow_multi, q, d_minutes, collected, self.rate
             )
 
 
 class ChoiceModalPart2(discord.ui.Modal, title="Créer un sondage (2/2)"):
     def __init__(self, cog: "Polls", channel_id: int, allow_multi: bool,
-                 question: str, d_minutes: Optional[int], first_lines: List[str], remaining: int):
+                 question: str, d_minutes: Optional[int], first_lines: List[str], remaining: int,
+                 rate: Tuple[int, float] = (VOTE_RATE_BURST, VOTE_RATE_PER_SECOND)):
         super().__init__(timeout=300)
         self.cog = cog
         self.channel_id = channel_id
@@ -456,6 +835,7 @@ class ChoiceModalPart2(discord.ui.Modal, title="Créer un sondage (2/2)"):
         self.question = question
         self.d_minutes = d_minutes
         self.first_lines = first_lines
+        self.rate = rate
         self.choice_inputs: List[discord.ui.TextInput] = []
         for i in range(remaining):
             ti = discord.ui.TextInput(
@@ -470,7 +850,7 @@ class ChoiceModalPart2(discord.ui.Modal, title="Créer un sondage (2/2)"):
     async def on_submit(self, interaction: discord.Interaction):
         lines = self.first_lines + [ci.value for ci in self.choice_inputs]
         await self.cog.create_poll_from_inputs(
-            interaction, self.channel_id, self.allow_multi, self.question, self.d_minutes, lines
+            interaction, self.channel_id, self.allow_multi, self.question, self.d_minutes, lines, self.rate
         )
 
 # =========================
@@ -484,6 +864,130 @@ class Polls(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._sessions: Dict[int, PollState] = {}
+        self._views: Dict[int, PollView] = {}
+        self._closed_at: Dict[int, float] = {}   # message_id -> monotonic
+        self._archive: "OrderedDict[int, ArchivedPoll]" = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self.renderer = PollRenderer(self)
+        self.scheduler = PollScheduler(self)
+        self.limiter = VoteRateLimiter()
+        self.store = PollStore()
+
+    async def cog_load(self):
+        # Restaure les sondages ouverts : vues persistantes + échéances
+        t0 = time.perf_counter()
+        rows = await asyncio.to_thread(self.store.load_open)
+        for row, votes in rows:
+            state = self._restore_state(row, votes)
+            self._sessions[state.message_id] = state
+            view = PollView(self, state)
+            self._views[state.message_id] = view
+            self.bot.add_view(view, message_id=state.message_id)
+            self.scheduler.schedule(state)
+        log.info("♻️ %d sondage(s) restauré(s) en %.1f ms",
+                 len(rows), (time.perf_counter() - t0) * 1000)
+        self._flush_votes.start()
+        self._evict_closed.start()
+
+    async def cog_unload(self):
+        self._flush_votes.cancel()
+        self._evict_closed.cancel()
+        self.renderer.close()
+        self.scheduler.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.to_thread(self.store.close)
+
+    def spawn(self, coro) -> asyncio.Task:
+        """create_task suivi : annulé au déchargement du cog."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ---------------------------- Cycle de vie --------------------------- #
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        state = self._sessions.get(payload.message_id)
+        if state is not None:
+            await self.drop_poll(state)
+
+    @tasks.loop(seconds=60)
+    async def _evict_closed(self):
+        limit = time.monotonic() - CLOSED_GRACE_SECONDS
+        for mid, closed_at in list(self._closed_at.items()):
+            if closed_at <= limit:
+                self.evict_poll(mid)
+
+    def evict_poll(self, message_id: int) -> None:
+        """Retire un sondage clôturé de la mémoire ; n'en garde qu'un résumé."""
+        self._closed_at.pop(message_id, None)
+        self.limiter.forget_poll(message_id)
+        state = self._sessions.pop(message_id, None)
+        view = self._views.pop(message_id, None)
+        if view is not None:
+            view.stop()   # retire aussi la vue du store de discord.py
+        if state is None:
+            return
+        state.status = "evicted"
+        self._archive[message_id] = ArchivedPoll(
+            message_id=message_id,
+            question=state.question,
+            labels=tuple(c.label for c in state.choices),
+            counts=tuple(state.counts),
+            closed_at=discord.utils.utcnow(),
+        )
+        while len(self._archive) > ARCHIVE_MAX:
+            self._archive.popitem(last=False)
+
+    def lifecycle_stats(self) -> Dict[str, int]:
+        by_status = Counter(s.status for s in self._sessions.values())
+        return {
+            "open": by_status["open"],
+            "closing": by_status["closing"],
+            "closed": by_status["closed"],
+            "archived": len(self._archive),
+            "live_bytes": sum(s.footprint() for s in self._sessions.values()),
+            "archived_bytes": sum(a.footprint() for a in self._archive.values()),
+            "deadlines": len(self.scheduler),
+            "rate_buckets": len(self.limiter),
+            "rate_limited": self.limiter.limited,
+            "tasks": len(self._tasks),
+        }
+
+    @tasks.loop(seconds=VOTE_FLUSH_SECONDS)
+    async def _flush_votes(self):
+        # une exception terminerait la boucle : on journalise, les votes restent en attente
+        try:
+            if self.store.pending:
+                await asyncio.to_thread(self.store.flush)
+        except Exception:
+            log.exception("Écriture des votes échouée, nouvel essai au prochain intervalle")
+
+    @staticmethod
+    def _restore_state(row: tuple, votes: Dict[int, int]) -> PollState:
+        message_id, channel_id, author_id, question, choices, allow_multi, end_ts, burst, per_s = row
+        state = PollState(
+            question=question,
+            choices=[Choice(label=label, emoji=coerce_emoji(emoji)) for label, emoji in choices],
+            author_id=author_id,
+            end_time=datetime.fromtimestamp(end_ts, tz=timezone.utc) if end_ts else None,
+            channel_id=channel_id,
+            message_id=message_id,
+            allow_multi=bool(allow_multi),
+            rate_burst=burst if burst is not None else VOTE_RATE_BURST,
+            rate_per_sec=per_s if per_s is not None else VOTE_RATE_PER_SECOND,
+        )
+        n = len(state.choices)
+        for uid, value in votes.items():
+            if state.allow_multi:
+                if 0 < value < (1 << n):
+                    state.votes_multi[uid] = _MASKS[value]
+            elif 0 <= value < n:
+                state.votes_single[uid] = value
+        state.recount()
+        return state
 
     # ------- Création depuis les inputs (emoji optionnel + label) ------- #
 
@@ -495,6 +999,7 @@ class Polls(commands.Cog):
         question: str,
         d_minutes: Optional[int],
         lines: List[str],
+        rate: Tuple[int, float] = (VOTE_RATE_BURST, VOTE_RATE_PER_SECOND),
     ):
         if len(lines) < 2:
             return await interaction.response.send_message("⚠️ Mets au moins deux choix.", ephemeral=True)
@@ -539,6 +1044,8 @@ class Polls(commands.Cog):
             end_time=end_time,
             channel_id=channel.id,
             allow_multi=allow_multi,
+            rate_burst=rate[0],
+            rate_per_sec=rate[1],
         )
 
         embed = self.build_running_embed(state, interaction.user)
@@ -559,6 +1066,13 @@ class Polls(commands.Cog):
 
         state.message_id = msg.id
         self._sessions[msg.id] = state
+        self._views[msg.id] = view
+        await asyncio.to_thread(
+            self.store.save_poll, msg.id, state.channel_id, state.author_id, state.question,
+            [(c.label, str(c.emoji) if c.emoji else None) for c in state.choices],
+            state.allow_multi, end_time.timestamp() if end_time else None,
+            state.rate_burst, state.rate_per_sec,
+        )
 
         parts = [f"✅ Sondage publié dans {channel.mention}"]
         if end_time:
@@ -570,21 +1084,69 @@ class Polls(commands.Cog):
         await interaction.followup.send(" • ".join(parts) + f"\n{msg.jump_url}", ephemeral=True)
 
         if end_time:
-            asyncio.create_task(self.run_countdown_and_close(msg, state))
+            self.scheduler.schedule(state)
 
     # ------------------------------ Embeds ------------------------------- #
 
-    def build_running_embed(self, state: PollState, author: discord.abc.User) -> discord.Embed:
+    def author_for(self, state: PollState) -> Optional[discord.abc.User]:
+        channel = self.bot.get_channel(state.channel_id)
+        guild = getattr(channel, "guild", None)
+        member = guild.get_member(state.author_id) if guild else None
+        return member or self.bot.get_user(state.author_id)
+
+    def poll_message(self, state: PollState) -> Optional[discord.PartialMessage]:
+        """Message du sondage construit depuis les ids stockés (aucun GET)."""
+        if not state.message_id:
+            return None
+        return self.bot.get_partial_messageable(state.channel_id).get_partial_message(state.message_id)
+
+    async def edit_running(self, state: PollState) -> bool:
+        """Édite le message du sondage avec l'embed courant. True si envoyé."""
+        msg = self.poll_message(state)
+        if msg is None:
+            return False
+        try:
+            await msg.edit(embed=self.build_running_embed(state, self.author_for(state)))
+        except discord.NotFound:
+            # message supprimé : on abandonne le sondage
+            await self.drop_poll(state)
+            return False
+        except discord.HTTPException:
+            return False
+        return True
+
+    async def drop_poll(self, state: PollState):
+        """Oublie un sondage dont le message n'existe plus."""
+        self.renderer.forget(state.message_id)
+        self.scheduler.cancel(state.message_id)
+        state.status = "closed"
+        if state.message_id:
+            self.evict_poll(state.message_id)
+            await self._mark_closed(state.message_id)
+
+    async def _mark_closed(self, message_id: int) -> None:
+        # une erreur de la base (ex : verrouillée) ne doit pas bloquer la clôture en mémoire
+        try:
+            await asyncio.to_thread(self.store.mark_closed, message_id)
+        except Exception:
+            log.exception("Clôture du sondage %s non enregistrée en base", message_id)
+
+    def build_running_embed(self, state: PollState, author: Optional[discord.abc.User]) -> discord.Embed:
         theme = THEMES[ACTIVE_THEME]
         counts = state.counts
-        total = sum(counts)
+        total = state.total
 
+        description = (
+            f"**{state.question}**\n\n"
+            f"{'Sélection multiple autorisée.' if state.allow_multi else 'Un seul choix par personne.'}"
+        )
+        if state.end_time:
+            # compte à rebours rendu par Discord (pas d'édition chaque seconde)
+            fin = state.end_time
+            description += f"\n⏳ Fin {discord.utils.format_dt(fin, 'R')} ({discord.utils.format_dt(fin, 'f')})"
         emb = discord.Embed(
             title=theme["title_running"],
-            description=(
-                f"**{state.question}**\n\n"
-                f"{'Sélection multiple autorisée.' if state.allow_multi else 'Un seul choix par personne.'}"
-            ),
+            description=description,
             color=theme["color_running"],
         )
         emb.set_author(
@@ -596,33 +1158,22 @@ class Polls(commands.Cog):
             emb.set_image(url=theme["banner_url"])
 
         for ch, c in zip(state.choices, counts):
-            pct = (c / total) if total > 0 else 0.0
-            bar = make_bar(pct)
-            pct_txt = f"{int(round(pct * 100)):>3d}%"
-            badge = "🟢" if pct >= 0.66 else ("🟠" if pct >= 0.33 else "⚪")
-            prefix = f"{ch.emoji} " if ch.emoji else ""
-            emb.add_field(
-                name=f"{prefix}{ch.label}",
-                value=(f"{bar}   **{c}** vote(s) • {badge} {pct_txt}"
-                       if BAR_STYLE == "emoji"
-                       else f"`{bar}`   **{c}** vote(s) • {badge} `{pct_txt}`"),
-                inline=False,
-            )
+            name, value = running_field(ch.label, ch.emoji, c, total, BAR_STYLE)
+            emb.add_field(name=name, value=value, inline=False)
 
         if state.end_time:
-            remaining = int(
-                (state.end_time - discord.utils.utcnow()).total_seconds())
-            emb.set_footer(text=f"Se termine dans {fmt_remaining(remaining)}")
+            emb.set_footer(text="Se termine")
+            emb.timestamp = state.end_time
         else:
             emb.set_footer(text="Aucune durée définie")
         return emb
 
-    def build_closed_embed(self, state: PollState, author: discord.abc.User) -> discord.Embed:
+    def build_closed_embed(self, state: PollState, author: Optional[discord.abc.User]) -> discord.Embed:
         theme = THEMES[ACTIVE_THEME]
         counts = state.counts
         order = sorted(range(len(counts)),
                        key=lambda i: counts[i], reverse=True)
-        total = sum(counts)
+        total = state.total
 
         emb = discord.Embed(
             title=theme["title_closed"],
@@ -639,39 +1190,28 @@ class Polls(commands.Cog):
 
         for rank, i in enumerate(order, start=1):
             ch = state.choices[i]
-            c = counts[i]
-            pct = (c / total) if total > 0 else 0.0
-            bar = make_bar(pct)
-            pct_txt = f"{int(round(pct * 100)):>3d}%"
-            prefix = f"{ch.emoji} " if ch.emoji else ""
-            emb.add_field(
-                name=f"{medal_for(rank)} {prefix}{ch.label}",
-                value=(f"{bar}   **{c}** vote(s) • {pct_txt}"
-                       if BAR_STYLE == "emoji"
-                       else f"`{bar}`   **{c}** vote(s) • `{pct_txt}`"),
-                inline=False,
-            )
+            name, value = closed_field(rank, ch.label, ch.emoji, counts[i], total, BAR_STYLE)
+            emb.add_field(name=name, value=value, inline=False)
 
         emb.set_footer(text=f"{total} vote(s) • Sondage terminé")
         return emb
 
     # ---------------------- Countdown & clôture -------------------------- #
 
-    async def run_countdown_and_close(self, message: discord.Message, state: PollState):
-        if not state.end_time:
+    async def close_poll(self, state: PollState):
+        """Clôture appelée par le scheduler à l'échéance."""
+        msg = self.poll_message(state)
+        if msg is not None:
+            await self.finalize_poll(msg, state)
+
+    async def finalize_poll(self, message: Union[discord.Message, discord.PartialMessage], state: PollState):
+        if state.status != "open":
             return
-        while True:
-            now = discord.utils.utcnow()
-            remaining = int((state.end_time - now).total_seconds())
-            if remaining <= 0:
-                break
-            embed = self.build_running_embed(state, message.author)
-            with contextlib.suppress(discord.HTTPException):
-                await message.edit(embed=embed)
-            await asyncio.sleep(1)
-        await self.finalize_poll(message, state)
-
-    async def finalize_poll(self, message: discord.Message, state: PollState):
+        state.status = "closing"
+        self.renderer.forget(state.message_id)
+        self.scheduler.cancel(state.message_id)
+        if state.message_id:
+            await self._mark_closed(state.message_id)
         try:
             view = PollView(self, state)
             for child in view.children:
@@ -679,9 +1219,17 @@ class Polls(commands.Cog):
                     child.disabled = True
         except Exception:
             view = None
-        closed = self.build_closed_embed(state, message.author)
+        closed = self.build_closed_embed(state, self.author_for(state))
         with contextlib.suppress(discord.HTTPException):
             await message.edit(content="**Sondage terminé** ⏰", embed=closed, view=view)
+        if view is not None:
+            view.stop()   # boutons désactivés : rien à écouter
+        live = self._views.pop(state.message_id, None) if state.message_id else None
+        if live is not None:
+            live.stop()
+        state.status = "closed"
+        if state.message_id:
+            self._closed_at[state.message_id] = time.monotonic()
 
     # ------------------------------ Commande ----------------------------- #
 
@@ -702,5 +1250,42 @@ class Polls(commands.Cog):
         )
 
 
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.command(name="sondages-stats", description="(Modo) Sondages en mémoire : actifs, archivés, empreinte")
+    async def sondages_stats(self, interaction: discord.Interaction):
+        st = self.lifecycle_stats()
+        rs = self.renderer.stats
+        embed = discord.Embed(title="📊 Sondages — état interne", color=discord.Color.blurple())
+        embed.add_field(
+            name="En mémoire",
+            value=(f"Ouverts : **{st['open']}** • en clôture : **{st['closing']}** • clôturés : **{st['closed']}**\n"
+                   f"Empreinte : **{st['live_bytes'] / 1024:.1f} Kio**"),
+            inline=False,
+        )
+        embed.add_field(
+            name="Archivés",
+            value=f"**{st['archived']}** résumé(s) • **{st['archived_bytes'] / 1024:.1f} Kio**",
+            inline=False,
+        )
+        embed.add_field(
+            name="Planification",
+            value=f"Échéances : **{st['deadlines']}** • tâches : **{st['tasks']}** • votes en attente : **{self.store.pending}**",
+            inline=False,
+        )
+        embed.add_field(
+            name="Anti-spam",
+            value=f"Clics freinés : **{st['rate_limited']}** • seaux actifs : **{st['rate_buckets']}**",
+            inline=False,
+        )
+        embed.add_field(
+            name="Rendus",
+            value=(f"Demandés : **{rs['requested']}** • regroupés : **{rs['coalesced']}** • "
+                   f"ignorés : **{rs['skipped']}** • envoyés : **{rs['sent']}**"),
+            inline=False,
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(Polls(bot))
@@ -1,35 +1,64 @@
 # -*- coding: utf-8 -*-
 # cogs/reaction_roles_wizard.py
 import asyncio
-import os
-import json
+import logging
 import re
+import time
+from collections import Counter, OrderedDict
 import discord
 from discord.ext import commands
 from discord import app_commands
 from config import GUILD_ID
+from cogs.rr_store import ReactionRoleStore
+from cogs.emoji_table import qualified_emoji, sanitize_unicode_emoji
+
+log = logging.getLogger("reaction_roles")
+
+# fenêtre de regroupement des ajouts/retraits de rôles d'un même membre (secondes)
+ROLE_MUTATION_WINDOW_SECONDS = 1.0
+# après une modification, le cache du membre peut ignorer notre propre édition ce délai
+RECENT_EDIT_SECONDS = 10.0
+# réconciliation : pause entre deux panneaux et entre deux appels REST de correction (secondes)
+RECONCILE_PAUSE_SECONDS = 2.0
+RECONCILE_CALL_INTERVAL_SECONDS = 0.5
+# ---------------- DB ----------------
 
-DB_PATH = os.path.join("data", "reaction_roles.json")
+# Panneaux en SQLite (cogs/rr_store.py) + index mémoire : message_id -> {"guild_id",
+# "channel_id", "map"}. Chargé une fois, tenu à jour à chaque écriture : les réactions
+# hors panneau sont rejetées par un simple test d'appartenance, sans accès disque.
+PANELS: dict[int, dict] = {}
+_store: ReactionRoleStore | None = None
+
+
+def get_store() -> ReactionRoleStore:
+    global _store
+    if _store is None:
+        _store = ReactionRoleStore()   # migre reaction_roles.json au premier lancement
+        PANELS.update(_store.load_panels())
+    return _store
 
-# ---------------- DB ----------------
 
+def load_panels() -> dict[int, dict]:
+    get_store()
+    return PANELS
 
-def ensure_db():
-    os.makedirs("data", exist_ok=True)
-    if not os.path.exists(DB_PATH):
-        with open(DB_PATH, "w", encoding="utf-8") as f:
-            json.dump({}, f)
 
+def close_store() -> None:
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+        PANELS.clear()
 
-def load_db():
-    ensure_db()
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
+async def add_panel(message_id: int, guild_id: int, channel_id: int | None, mapping: dict[str, int]) -> None:
+    await asyncio.to_thread(get_store().add_panel, message_id, guild_id, channel_id, mapping)
+    PANELS[message_id] = {"guild_id": guild_id, "channel_id": channel_id, "map": mapping}
 
-def save_db(db):
-    with open(DB_PATH, "w", encoding="utf-8") as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
+
+async def remove_panel(message_id: int) -> None:
+    if PANELS.pop(message_id, None) is not None:
+        await asyncio.to_thread(get_store().delete_panel, message_id)
 
 
 # ------------- EMOJI UTILS -------------
@@ -43,9 +72,11 @@ def to_partial_emoji(s: str) -> discord.PartialEmoji | str:
     return s
 
 
-def sanitize_unicode_emoji(s: str) -> str:
-    INVIS = "\uFE0F\uFE0E\u200D\u200C\u200B\u2060\u00A0"
-    return "".join(ch for ch in s if ch not in INVIS).strip()
+def emoji_key(emoji: discord.PartialEmoji | discord.Emoji | str) -> str:
+    """Clé d'un emoji de réaction dans ``map`` : <:nom:id> ou unicode nettoyé."""
+    if isinstance(emoji, str):
+        return sanitize_unicode_emoji(emoji)
+    return str(emoji) if emoji.id else sanitize_unicode_emoji(emoji.name)
 
 
 def emoji_from_role_name(name: str) -> str | None:
@@ -60,16 +91,12 @@ def emoji_from_role_name(name: str) -> str | None:
 
 async def pretest_emojis(bot: commands.Bot, channel: discord.TextChannel,
                          emoji_list: list[discord.PartialEmoji | str]) -> tuple[bool, list[str]]:
-    perms = channel.permissions_for(channel.guild.me)
-    if not perms.add_reactions or not perms.read_message_history:
-        return False, ["Le bot n’a pas la permission **Ajouter des réactions** et/ou **Lire l’historique**."]
-
+    """Test côté Discord, réservé aux émojis absents de la table locale."""
     tmp = await channel.send("⏳ Vérification des émojis… (message auto-supprimé)")
     errors = []
     for e in emoji_list:
         try:
             await tmp.add_reaction(e)
-            await asyncio.sleep(0.15)
         except Exception as err:
             errors.append(f"{e} → {err}")
     try:
@@ -78,6 +105,255 @@ async def pretest_emojis(bot: commands.Bot, channel: discord.TextChannel,
         pass
     return (len(errors) == 0, errors)
 
+# ------------- FILE DE RÔLES -------------
+
+
+class RoleMutationQueue:
+    """
+    Regroupe les ajouts/retraits de rôles par membre.
+    Chaque réaction ne fait que noter l'état voulu (rôle → présent ou non) ;
+    après ``window`` secondes, seul l'écart net part (``add_roles`` /
+    ``remove_roles``, un appel par rôle) : les autres rôles du membre ne sont
+    jamais réécrits, même si le cache n'a pas encore vu un changement récent.
+    Un ajout suivi d'un retrait dans la fenêtre s'annule sans appel REST.
+    """
+
+    def __init__(self, bot: commands.Bot, *, window: float = ROLE_MUTATION_WINDOW_SECONDS):
+        self.bot = bot
+        self.window = window
+        self._pending: dict[tuple[int, int], dict[int, bool]] = {}
+        self._tasks: dict[tuple[int, int], asyncio.Task] = {}
+        # membres modifiés récemment -> instant (monotonic) : leur cache peut être en retard
+        self._recent: "OrderedDict[tuple[int, int], float]" = OrderedDict()
+        # compteurs
+        self.requested = 0   # mutations demandées (1 par réaction)
+        self.skipped = 0     # envois annulés (rôles déjà dans l'état voulu)
+        self.sent = 0        # rôles réellement ajoutés/retirés (1 appel REST chacun)
+        self.failed = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "requested": self.requested,
+            "skipped": self.skipped,
+            "sent": self.sent,
+            "failed": self.failed,
+            # 1 appel REST par mutation sans regroupement
+            "saved": self.requested - self.sent - self.failed,
+        }
+
+    def set_role(self, guild_id: int, member_id: int, role_id: int, present: bool) -> None:
+        key = (guild_id, member_id)
+        self.requested += 1
+        self._pending.setdefault(key, {})[role_id] = present
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._flush_later(key))
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
+
+    async def drain(self) -> None:
+        """Attend que toutes les mutations en attente soient envoyées."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _flush_later(self, key: tuple[int, int]) -> None:
+        try:
+            await asyncio.sleep(self.window)
+            changes = self._pending.pop(key, None)
+            if changes:
+                await self._apply(key, changes)
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+                # une réaction est arrivée pendant l'envoi → on replanifie
+                if key in self._pending:
+                    self._tasks[key] = asyncio.create_task(self._flush_later(key))
+
+    async def _apply(self, key: tuple[int, int], changes: dict[int, bool]) -> None:
+        guild = self.bot.get_guild(key[0])
+        member = guild.get_member(key[1]) if guild else None
+        if member is None:
+            return
+        wanted = {rid for rid, present in changes.items() if present}
+        unwanted = {rid for rid, present in changes.items() if not present}
+        now = time.monotonic()
+        while self._recent and next(iter(self._recent.values())) < now - RECENT_EDIT_SECONDS:
+            self._recent.popitem(last=False)
+        if key not in self._recent:
+            # cache à jour : on ne renvoie pas un rôle déjà dans l'état voulu
+            current = {r.id for r in member.roles}
+            wanted -= current
+            unwanted &= current
+        add = [r for r in map(guild.get_role, wanted) if r is not None]
+        remove = [r for r in map(guild.get_role, unwanted) if r is not None]
+        if not add and not remove:
+            self.skipped += 1
+            return
+        self._recent[key] = now
+        self._recent.move_to_end(key)
+        try:
+            if add:
+                await member.add_roles(*add, reason="Reaction Roles")
+                self.sent += len(add)
+            if remove:
+                await member.remove_roles(*remove, reason="Reaction Roles")
+                self.sent += len(remove)
+        except discord.HTTPException as e:
+            self.failed += 1
+            log.warning("Reaction Roles : rôles de %s non modifiés : %s", member.id, e)
+
+# ------------- RÉCONCILIATION -------------
+
+
+class PanelReconciler:
+    """
+    Remet les rôles en accord avec les réactions des panneaux (réactions ou
+    retraits faits pendant que le bot était hors ligne). Un panneau à la fois,
+    progression en base : une passe interrompue reprend où elle s'était arrêtée.
+    Les corrections partent une à une, espacées de ``interval`` secondes : le
+    débit reste sous la limite de Discord sans compter sur les nouvelles
+    tentatives après un 429.
+    Retraits : pour un rôle lié à un seul panneau et dont la réaction est encore
+    sur le message, tout membre qui a le rôle sans avoir réagi le perd, même si
+    le rôle lui a été donné à la main.
+    """
+
+    def __init__(self, cog: "ReactionRolesWizard", *, pause: float = RECONCILE_PAUSE_SECONDS,
+                 interval: float = RECONCILE_CALL_INTERVAL_SECONDS):
+        self.cog = cog
+        self.pause = pause
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        # compteurs
+        self.panels = 0    # panneaux vérifiés
+        self.added = 0     # rôles ajoutés (réaction sans rôle)
+        self.removed = 0   # rôles retirés (rôle sans réaction)
+        self.dropped = 0   # panneaux dont le message a disparu
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        await self.cog.bot.wait_until_ready()
+        store = get_store()
+        started = await asyncio.to_thread(store.reconcile_run, time.time())
+        pending = await asyncio.to_thread(store.reconcile_pending, started)
+        log.info("🔁 Reaction Roles : %d panneau(x) à réconcilier", len(pending))
+        for mid in pending:
+            entry = PANELS.get(mid)
+            if entry is None:
+                continue
+            try:
+                await self.reconcile_panel(mid, entry)
+            except discord.HTTPException as e:
+                # non marqué : repris par la prochaine passe
+                log.warning("Reaction Roles : panneau %s non réconcilié : %s", mid, e)
+            else:
+                await asyncio.to_thread(store.mark_reconciled, mid, time.time())
+            await asyncio.sleep(self.pause)
+        await asyncio.to_thread(store.finish_reconcile)
+        log.info("✅ Reaction Roles : réconciliation terminée (+%d / -%d rôles, %d panneau(x) disparu(s))",
+                 self.added, self.removed, self.dropped)
+
+    async def _find_message(self, guild: discord.Guild, mid: int,
+                            entry: dict) -> tuple[discord.Message | None, bool]:
+        """Panneau migré du JSON (salon inconnu) : cherché une fois dans les salons.
+        Retourne (message, False), ou (None, True) si au moins un salon était illisible."""
+        hidden = False
+        for channel in guild.text_channels:
+            if not channel.permissions_for(guild.me).read_message_history:
+                hidden = True
+                continue
+            try:
+                message = await channel.fetch_message(mid)
+            except discord.NotFound:
+                continue
+            except discord.Forbidden:
+                hidden = True
+                continue
+            entry["channel_id"] = channel.id
+            await asyncio.to_thread(get_store().set_channel, mid, channel.id)
+            return message, False
+        return None, hidden
+
+    async def reconcile_panel(self, mid: int, entry: dict) -> None:
+        guild = self.cog.bot.get_guild(entry["guild_id"])
+        if guild is None:
+            return
+        if entry["channel_id"] is None:
+            message, hidden = await self._find_message(guild, mid, entry)
+            if message is None:
+                if not hidden:
+                    # introuvable partout : supprimé, inutile de rescanner à chaque démarrage
+                    self.dropped += 1
+                    await remove_panel(mid)
+                return   # sinon peut-être dans un salon illisible : on garde le panneau
+        else:
+            channel = guild.get_channel(entry["channel_id"])
+            message = None
+            if channel is not None:
+                try:
+                    message = await channel.fetch_message(mid)
+                except discord.NotFound:
+                    pass
+            if message is None:
+                # salon ou message supprimé pendant l'absence du bot
+                self.dropped += 1
+                await remove_panel(mid)
+                return
+
+        self.panels += 1
+        panels_per_role = Counter(rid for p in PANELS.values() for rid in p["map"].values())
+        me = self.cog.bot.user.id
+        changes: dict[int, list[tuple[int, bool]]] = {}   # membre -> [(rôle, présent)]
+        for reaction in message.reactions:
+            role_id = entry["map"].get(emoji_key(reaction.emoji))
+            role = guild.get_role(role_id) if role_id else None
+            if role is None:
+                continue
+            reactors = {u.id async for u in reaction.users(limit=None)} - {me}   # pages de 100
+            holders = {m.id for m in role.members}
+            for uid in reactors - holders:
+                if guild.get_member(uid):
+                    changes.setdefault(uid, []).append((role.id, True))
+            if panels_per_role[role.id] == 1:
+                for uid in holders - reactors:
+                    changes.setdefault(uid, []).append((role.id, False))
+
+        # un appel REST par rôle (écart net, comme la file), à intervalle fixe
+        for uid, member_changes in changes.items():
+            member = guild.get_member(uid)
+            if member is None:
+                continue
+            for role_id, present in member_changes:
+                role = guild.get_role(role_id)
+                try:
+                    if present:
+                        await member.add_roles(role, reason="Reaction Roles (réconciliation)")
+                        self.added += 1
+                    else:
+                        await member.remove_roles(role, reason="Reaction Roles (réconciliation)")
+                        self.removed += 1
+                except (discord.Forbidden, discord.NotFound) as e:
+                    # rôle au-dessus du bot, membre parti : réessayer n'y changerait rien
+                    log.warning("Reaction Roles : rôle %s de %s non corrigé : %s", role_id, uid, e)
+                await asyncio.sleep(self.interval)
+
 # ------------- VIEW -------------
 
 
@@ -104,7 +380,13 @@ class RolePickView(discord.ui.View):
         mapping: dict[str, int] = {}
         lines: list[str] = []
         emoji_for_react: list[discord.PartialEmoji | str] = []
+        unknown: list[str] = []   # absents de la table : test côté Discord
         perms = self.channel.permissions_for(self.channel.guild.me)
+        if not perms.add_reactions or not perms.read_message_history:
+            return await interaction.response.send_message(
+                "❌ Le bot n’a pas la permission **Ajouter des réactions** et/ou **Lire l’historique**.",
+                ephemeral=True
+            )
 
         for role in roles:
             emj_raw = emoji_from_role_name(role.name)
@@ -116,7 +398,13 @@ class RolePickView(discord.ui.View):
 
             obj = to_partial_emoji(emj_raw)
             if isinstance(obj, discord.PartialEmoji) and obj.id:
-                if not perms.external_emojis and not self.channel.guild.get_emoji(obj.id):
+                custom = interaction.client.get_emoji(obj.id)
+                if custom is None or not custom.available:
+                    return await interaction.response.send_message(
+                        f"❌ L’emoji **{emj_raw}** est introuvable ou indisponible pour le bot.",
+                        ephemeral=True
+                    )
+                if custom.guild_id != self.channel.guild.id and not perms.external_emojis:
                     return await interaction.response.send_message(
                         f"❌ L’emoji **{emj_raw}** est un emoji *custom* externe.",
                         ephemeral=True
@@ -124,9 +412,11 @@ class RolePickView(discord.ui.View):
                 key = str(obj)
                 react_item = obj
             else:
-                uni = sanitize_unicode_emoji(str(obj))
-                key = uni
-                react_item = uni
+                key = sanitize_unicode_emoji(str(obj))
+                react_item = qualified_emoji(key)
+                if react_item is None:
+                    react_item = key
+                    unknown.append(key)
 
             if key in mapping:
                 return await interaction.response.send_message(
@@ -138,13 +428,16 @@ class RolePickView(discord.ui.View):
             emoji_for_react.append(react_item)
             lines.append(f"{emj_raw}  →  {role.mention}")
 
-        ok, errs = await pretest_emojis(interaction.client, self.channel, emoji_for_react)
-        if not ok:
-            bullet = "\n".join(f"• {e}" for e in errs[:10])
-            return await interaction.response.send_message(
-                "❌ Certains émojis ne fonctionnent pas :\n" + bullet,
-                ephemeral=True
-            )
+        # publication + réactions : plusieurs secondes pour un grand panneau
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if unknown:
+            ok, errs = await pretest_emojis(interaction.client, self.channel, unknown)
+            if not ok:
+                bullet = "\n".join(f"• {e}" for e in errs[:10])
+                return await interaction.followup.send(
+                    "❌ Certains émojis ne fonctionnent pas :\n" + bullet,
+                    ephemeral=True
+                )
 
         embed = discord.Embed(
             title=self.title, description=self.desc, colour=discord.Colour.blurple())
@@ -157,13 +450,10 @@ class RolePickView(discord.ui.View):
                 await msg.add_reaction(e)
             except Exception:
                 await msg.add_reaction(str(e))
-            await asyncio.sleep(0.2)
 
-        db = load_db()
-        db[str(msg.id)] = {"guild_id": interaction.guild_id, "map": mapping}
-        save_db(db)
+        await add_panel(msg.id, interaction.guild_id, self.channel.id, mapping)
 
-        await interaction.response.send_message(
+        await interaction.followup.send(
             f"✅ Reaction Roles créé dans {self.channel.mention} (ID `{msg.id}`)", ephemeral=True
         )
         self.stop()
@@ -176,47 +466,71 @@ class ReactionRolesWizard(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        ensure_db()
+        self.roles = RoleMutationQueue(bot)
+        self.reconciler = PanelReconciler(self)
+        load_panels()
+
+    async def cog_load(self):
+        self.reconciler.start()
+
+    async def cog_unload(self):
+        self.reconciler.close()
+        self.roles.close()
+        close_store()
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if payload.user_id == self.bot.user.id:
-            return
-        entry = load_db().get(str(payload.message_id))
-        if not entry:
+        entry = PANELS.get(payload.message_id)
+        if not entry or payload.user_id == self.bot.user.id:
             return
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
-        role_id = entry["map"].get(str(payload.emoji))
-        if not role_id:
-            return
-        member = guild.get_member(payload.user_id)
-        role = guild.get_role(role_id)
-        if member and role:
-            try:
-                await member.add_roles(role, reason="Reaction Roles: add")
-            except:
-                pass
+        role_id = entry["map"].get(emoji_key(payload.emoji))
+        if role_id and guild.get_role(role_id):
+            self.roles.set_role(guild.id, payload.user_id, role_id, True)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        entry = load_db().get(str(payload.message_id))
+        entry = PANELS.get(payload.message_id)
         if not entry:
             return
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
-        role_id = entry["map"].get(str(payload.emoji))
-        if not role_id:
-            return
-        member = guild.get_member(payload.user_id)
-        role = guild.get_role(role_id)
-        if member and role:
-            try:
-                await member.remove_roles(role, reason="Reaction Roles: remove")
-            except:
-                pass
+        role_id = entry["map"].get(emoji_key(payload.emoji))
+        if role_id and guild.get_role(role_id):
+            self.roles.set_role(guild.id, payload.user_id, role_id, False)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.message_id in PANELS:
+            await remove_panel(payload.message_id)
+
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.command(name="rr-stats", description="(Modo) Reaction Roles : appels REST regroupés")
+    async def rr_stats(self, interaction: discord.Interaction):
+        rs = self.roles.stats
+        rc = self.reconciler
+        await interaction.response.send_message(
+            f"Réactions traitées : **{rs['requested']}** • rôles modifiés : **{rs['sent']}** • "
+            f"déjà à jour : **{rs['skipped']}** • échecs : **{rs['failed']}**\n"
+            f"Appels REST économisés : **{rs['saved']}**\n"
+            f"Réconciliation{' (en cours)' if rc.running else ''} : **{rc.panels}** panneau(x) • "
+            f"+**{rc.added}** / -**{rc.removed}** rôle(s) • **{rc.dropped}** panneau(x) disparu(s)",
+            ephemeral=True
+        )
+
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    @app_commands.checks.has_permissions(manage_guild=True)
+    @app_commands.command(name="rr-resync", description="(Modo) Réconcilier les rôles avec les réactions des panneaux")
+    async def rr_resync(self, interaction: discord.Interaction):
+        if not self.reconciler.start():
+            return await interaction.response.send_message("⏳ Une réconciliation est déjà en cours.", ephemeral=True)
+        await interaction.response.send_message(
+            "🔁 Réconciliation lancée en arrière-plan (suivi : `/rr-stats`).", ephemeral=True
+        )
 
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     @app_commands.command(
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# cogs/rr_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from cogs.emoji_table import ZWJ, zwj_sequences
+
+DB_PATH = os.path.join("data", "reaction_roles.db")
+LEGACY_JSON = os.path.join("data", "reaction_roles.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rr_panels (
+    message_id  INTEGER PRIMARY KEY,
+    guild_id    INTEGER NOT NULL,
+    channel_id  INTEGER,                       -- NULL pour les panneaux migrés du JSON
+    created_at  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rr_panels_guild ON rr_panels (guild_id);
+
+CREATE TABLE IF NOT EXISTS rr_mappings (
+    message_id  INTEGER NOT NULL REFERENCES rr_panels (message_id) ON DELETE CASCADE,
+    emoji       TEXT    NOT NULL,              -- unicode nettoyé ou <:nom:id>
+    role_id     INTEGER NOT NULL,
+    PRIMARY KEY (message_id, emoji)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rr_mappings_role ON rr_mappings (role_id);
+
+-- réconciliation : date du dernier passage par panneau ; une passe non terminée
+-- (clé reconcile_started dans rr_meta) reprend là où elle s'est arrêtée
+CREATE TABLE IF NOT EXISTS rr_reconcile (
+    message_id  INTEGER PRIMARY KEY REFERENCES rr_panels (message_id) ON DELETE CASCADE,
+    done_at     REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rr_meta (
+    key    TEXT PRIMARY KEY,
+    value
+) WITHOUT ROWID;
+"""
+
+
+class ReactionRoleStore:
+    """
+    Panneaux Reaction Roles en SQLite (WAL) : une ligne par panneau et par
+    emoji → rôle. Chaque écriture est une transaction limitée aux lignes du
+    panneau concerné. Migration unique depuis l'ancien ``reaction_roles.json``.
+    Méthodes synchrones : côté cog, on les appelle via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str = DB_PATH, legacy_json: str = LEGACY_JSON):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        migrated = self._migrate_json(legacy_json)
+        if migrated or self._conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self._rekey_zwj()
+
+    def _migrate_json(self, legacy_json: str) -> bool:
+        """Importe le JSON en une transaction puis le renomme (.migrated) : jamais rejoué."""
+        if not os.path.exists(legacy_json):
+            return False
+        with open(legacy_json, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        now = time.time()
+        with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+            cur.executemany(
+                "INSERT OR IGNORE INTO rr_panels (message_id, guild_id, channel_id, created_at) VALUES (?, ?, NULL, ?)",
+                [(int(mid), entry["guild_id"], now) for mid, entry in legacy.items()],
+            )
+            cur.executemany(
+                "INSERT OR IGNORE INTO rr_mappings (message_id, emoji, role_id) VALUES (?, ?, ?)",
+                [(int(mid), emoji, role_id) for mid, entry in legacy.items()
+                 for emoji, role_id in entry["map"].items()],
+            )
+        os.replace(legacy_json, legacy_json + ".migrated")
+        return True
+
+    def _rekey_zwj(self) -> None:
+        """Clés écrites par l'ancien nettoyage (ZWJ retiré, ex. 👨👩👧) : remises sous
+        la forme avec ZWJ que produisent désormais les réactions."""
+        restore = zwj_sequences()
+        with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+            stale = [(restore[emoji], emoji) for (emoji,) in cur.execute(
+                f"SELECT DISTINCT emoji FROM rr_mappings WHERE instr(emoji, '{ZWJ}') = 0"
+            ) if emoji in restore]
+            cur.executemany("UPDATE OR IGNORE rr_mappings SET emoji = ? WHERE emoji = ?", stale)
+            cur.execute("PRAGMA user_version = 1")
+
+    # ----------------------------- Panneaux ---------------------------- #
+
+    def add_panel(self, message_id: int, guild_id: int, channel_id: Optional[int],
+                  mapping: Dict[str, int]) -> None:
+        with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+            cur.execute(
+                "INSERT INTO rr_panels (message_id, guild_id, channel_id, created_at) VALUES (?, ?, ?, ?)",
+                (message_id, guild_id, channel_id, time.time()),
+            )
+            cur.executemany(
+                "INSERT INTO rr_mappings (message_id, emoji, role_id) VALUES (?, ?, ?)",
+                [(message_id, emoji, role_id) for emoji, role_id in mapping.items()],
+            )
+
+    def delete_panel(self, message_id: int) -> bool:
+        """Supprime le panneau et ses associations (cascade). False s'il n'existait pas."""
+        with self._lock, self._conn, closing(self._conn.cursor()) as cur:
+            return cur.execute("DELETE FROM rr_panels WHERE message_id = ?", (message_id,)).rowcount > 0
+
+    def set_channel(self, message_id: int, channel_id: int) -> None:
+        """Salon retrouvé pour un panneau migré (channel_id NULL)."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE rr_panels SET channel_id = ? WHERE message_id = ?", (channel_id, message_id))
+
+    def load_panels(self) -> Dict[int, dict]:
+        """{message_id: {"guild_id", "channel_id", "map": {emoji: role_id}}}"""
+        with self._lock, closing(self._conn.cursor()) as cur:
+            panels = {
+                mid: {"guild_id": gid, "channel_id": cid, "map": {}}
+                for mid, gid, cid in cur.execute("SELECT message_id, guild_id, channel_id FROM rr_panels")
+            }
+            for mid, emoji, role_id in cur.execute("SELECT message_id, emoji, role_id FROM rr_mappings"):
+                panels[mid]["map"][emoji] = role_id
+        return panels
+
+    # -------------------------- Réconciliation ------------------------- #
+
+    def reconcile_run(self, now: float) -> float:
+        """Début de la passe en cours, ou ``now`` si aucune n'est inachevée."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM rr_meta WHERE key = 'reconcile_started'").fetchone()
+            if row:
+                return row[0]
+            self._conn.execute("INSERT INTO rr_meta (key, value) VALUES ('reconcile_started', ?)", (now,))
+            return now
+
+    def reconcile_pending(self, started: float) -> List[int]:
+        """Panneaux pas encore traités depuis ``started``, dans un ordre stable."""
+        with self._lock, closing(self._conn.cursor()) as cur:
+            return [mid for (mid,) in cur.execute(
+                "SELECT p.message_id FROM rr_panels p LEFT JOIN rr_reconcile r USING (message_id) "
+                "WHERE r.done_at IS NULL OR r.done_at < ? ORDER BY p.message_id",
+                (started,),
+            )]
+
+    def mark_reconciled(self, message_id: int, now: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                # SELECT : rien si le panneau a été supprimé entre-temps
+                "INSERT INTO rr_reconcile (message_id, done_at) "
+                "SELECT message_id, ? FROM rr_panels WHERE message_id = ? "
+                "ON CONFLICT (message_id) DO UPDATE SET done_at = excluded.done_at",
+                (now, message_id),
+            )
+
+    def finish_reconcile(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rr_meta WHERE key = 'reconcile_started'")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
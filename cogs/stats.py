@@ -1,34 +1,42 @@
 # -*- coding: utf-8 -*-
 # cogs/stats.py
-import os
-import sqlite3
-from contextlib import closing
-from typing import Optional, Iterable, Tuple
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 
 from config import GUILD_ID
+from cogs.utils import current_game
+from cogs.stats_store import (
+    GAME_PLAYERS_SQL, MEMBER_RANKS_SQL, PERIOD_GAME_PLAYERS_SQL, PERIOD_MEMBER_GAMES_SQL,
+    PERIOD_TOP_GAMES_SQL, StatsStore, day_key, period_bounds, split_days,
+)
+
+log = logging.getLogger("stats")
 
-DB_PATH = os.path.join("data", "stats.db")
 GUILD_OBJ = discord.Object(id=GUILD_ID) if GUILD_ID else None
 
+# temps de jeu tamponné en mémoire puis écrit par lots (secondes)
+PLAYTIME_FLUSH_SECONDS = 60
+# écart maximal (arrêt du bot) crédité à une session reprise au démarrage
+RESUME_MAX_GAP_SECONDS = 15 * 60
+# noms d'affichage déjà enregistrés (LRU) : seules les nouveautés sont écrites
+MEMBER_NAMES_LRU = 10_000
+# compaction de l'historique (jours → mois, rétention)
+COMPACT_HOURS = 6
 
-def _ensure_db() -> None:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    with closing(sqlite3.connect(DB_PATH)) as conn, conn, closing(conn.cursor()) as cur:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS game_stats (
-                guild_id   INTEGER NOT NULL,
-                member_id  INTEGER NOT NULL,
-                game       TEXT    NOT NULL,
-                seconds    INTEGER NOT NULL DEFAULT 0,
-                PRIMARY KEY (guild_id, member_id, game)
-            )
-            """
-        )
+PERIOD_CHOICES = [
+    app_commands.Choice(name="7 derniers jours", value="7j"),
+    app_commands.Choice(name="30 derniers jours", value="30j"),
+    app_commands.Choice(name="12 derniers mois", value="12m"),
+    app_commands.Choice(name="Depuis le début", value="tout"),
+]
+PERIOD_LABELS = {c.value: c.name for c in PERIOD_CHOICES}
 
 
 def _fmt_duration(seconds: int) -> str:
@@ -47,21 +55,191 @@ class StatsCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        _ensure_db()
+        self.db = StatsStore()
+        # sessions de jeu ouvertes : (guild_id, member_id) -> (jeu, crédité jusqu'à time.time())
+        self._playing: Dict[Tuple[int, int], Tuple[str, float]] = {}
+        # temps à écrire : (guild_id, member_id, jeu, jour AAAAMMJJ) -> secondes
+        self._pending: Dict[Tuple[int, int, str, int], float] = {}
+        # sessions à sauvegarder au prochain flush : ouvertes (jeu, début) / fermées
+        self._opened: Dict[Tuple[int, int], Tuple[str, float]] = {}
+        self._closed: Set[Tuple[int, int]] = set()
+        # noms d'affichage : connus (LRU, déjà en base ou en attente) / à écrire
+        self._names: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self._names_pending: Dict[Tuple[int, int], str] = {}
+        # (point de contrôle, sessions) du dernier arrêt, réconciliés au premier on_ready
+        self._saved: Optional[Tuple[Optional[float], list]] = None
+
+    async def cog_load(self):
+        self._saved = await self.db.load_sessions()
+        await self.db.sync_external()   # référence pour détecter les imports hors bot
+        self._flush_loop.start()
+        self._compact_loop.start()
+
+    async def cog_unload(self):
+        self._flush_loop.cancel()
+        self._compact_loop.cancel()
+        # les sessions restent en base : reprises au redémarrage si toujours en jeu
+        await self.flush_playtime()
+        await asyncio.to_thread(self.db.close)
 
     # --------------------------------------------------------------------- #
-    # Utilitaires DB
+    # Suivi des sessions de jeu (présences)
     # --------------------------------------------------------------------- #
-    def _query(
-        self, sql: str, args: Iterable = ()
-    ) -> list[Tuple]:
-        with closing(sqlite3.connect(DB_PATH)) as conn, closing(conn.cursor()) as cur:
-            cur.execute(sql, args)
-            return cur.fetchall()
-
-    def _exec(self, sql: str, args: Iterable = ()) -> None:
-        with closing(sqlite3.connect(DB_PATH)) as conn, conn, closing(conn.cursor()) as cur:
-            cur.execute(sql, args)
+    def _credit(self, key: Tuple[int, int], game: str, since: float, now: float) -> None:
+        # une session à cheval sur minuit est répartie sur chaque jour
+        for day, seconds in split_days(since, now):
+            self.add_playtime(key[0], key[1], game, seconds, day=day)
+
+    def _end_session(self, key: Tuple[int, int], now: float) -> None:
+        game, since = self._playing.pop(key)
+        self._credit(key, game, since, now)
+        self._opened.pop(key, None)
+        self._closed.add(key)
+
+    def _start_session(self, key: Tuple[int, int], game: str, now: float) -> None:
+        self._playing[key] = (game, now)
+        self._opened[key] = (game, now)
+
+    def _note_member(self, key: Tuple[int, int], name: str) -> None:
+        if self._names.get(key) == name:
+            self._names.move_to_end(key)
+            return
+        self._names[key] = name
+        self._names.move_to_end(key)
+        self._names_pending[key] = name
+        if len(self._names) > MEMBER_NAMES_LRU:
+            self._names.popitem(last=False)
+
+    def _forget_guild(self, guild_id: int, now: float) -> None:
+        """Avant une remise à zéro : jette le temps et les noms tamponnés de la guilde.
+        Les sessions en cours repartent de ``now`` et sont réenregistrées au prochain flush
+        (la remise à zéro vide aussi open_sessions et members)."""
+        self._pending = {k: v for k, v in self._pending.items() if k[0] != guild_id}
+        self._closed = {k for k in self._closed if k[0] != guild_id}
+        self._names_pending = {k: v for k, v in self._names_pending.items() if k[0] != guild_id}
+        for key in [k for k in self._names if k[0] == guild_id]:
+            del self._names[key]
+        guild = self.bot.get_guild(guild_id)
+        for key, (game, _since) in self._playing.items():
+            if key[0] != guild_id:
+                continue
+            self._playing[key] = self._opened[key] = (game, now)
+            member = guild.get_member(key[1]) if guild else None
+            if member:
+                self._note_member(key, member.display_name)
+
+    def _track(self, member: discord.Member, now: float) -> None:
+        key = (member.guild.id, member.id)
+        game = current_game(member)
+        session = self._playing.get(key)
+        if game or session:   # seuls les joueurs apparaissent dans les classements
+            self._note_member(key, member.display_name)
+        if session and session[0] == game:
+            return
+        if session:
+            self._end_session(key, now)
+        if game:
+            self._start_session(key, game, now)
+
+    def _reconcile(self, now: float) -> None:
+        """Sessions du dernier arrêt : reprises si le membre joue toujours au même jeu
+        (depuis le point de contrôle, écart plafonné), fermées sinon — le temps
+        jusqu'au point de contrôle est déjà crédité."""
+        checkpoint, sessions = self._saved
+        self._saved = None
+        for guild_id, member_id, game, _started in sessions:
+            key = (guild_id, member_id)
+            if key in self._playing:   # déjà suivie (présence reçue avant on_ready)
+                continue
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(member_id) if guild else None
+            if checkpoint is not None and member and current_game(member) == game:
+                since = checkpoint if now - checkpoint <= RESUME_MAX_GAP_SECONDS else now
+                self._playing[key] = (game, since)
+            else:
+                self._closed.add(key)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        now = time.time()
+        if self._saved is not None:
+            self._reconcile(now)
+        # membres déjà en jeu au (re)démarrage ; après une reconnexion, les présences
+        # manquées pendant la coupure sont rattrapées (_track ignore un jeu inchangé)
+        for guild in self.bot.guilds:
+            for member in guild.members:
+                if not member.bot:
+                    self._track(member, now)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        if after.bot:
+            return
+        self._track(after, time.time())
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        if key in self._playing:
+            self._end_session(key, time.time())
+
+    @tasks.loop(seconds=PLAYTIME_FLUSH_SECONDS)
+    async def _flush_loop(self):
+        # une exception terminerait la boucle : on journalise, le lot est remis en attente
+        try:
+            # import stats_cli depuis le dernier passage : classements et autocomplétion à refaire
+            if await self.db.sync_external():
+                log.info("Base modifiée hors du bot : caches des stats vidés")
+            await self.flush_playtime()
+        except Exception:
+            log.exception("Écriture du temps de jeu échouée, nouvel essai au prochain intervalle")
+
+    async def flush_playtime(self) -> int:
+        """Crédite les sessions ouvertes jusqu'à maintenant puis écrit, en une transaction
+        (hors boucle asyncio), le temps tamponné, les sessions ouvertes/fermées et le
+        point de contrôle. Coût borné : une écriture par intervalle, quel que soit le
+        nombre de sessions en cours."""
+        now = time.time()
+        for key, (game, since) in self._playing.items():
+            self._credit(key, game, since, now)
+            self._playing[key] = (game, now)
+        if not (self._pending or self._opened or self._closed or self._playing or self._names_pending):
+            return 0
+        batch, self._pending = self._pending, {}
+        names, self._names_pending = self._names_pending, {}
+        opened, self._opened = self._opened, {}
+        closed, self._closed = self._closed, set()
+        rows = [(g, m, game, int(round(sec)), day) for (g, m, game, day), sec in batch.items() if sec >= 1]
+        try:
+            await self.db.add_playtime(
+                rows,
+                opened=[(g, m, game, started) for (g, m), (game, started) in opened.items()],
+                closed=closed,
+                members=[(g, m, name, now) for (g, m), name in names.items()],
+                # avant la réconciliation, les sessions en base ne sont pas encore créditées
+                checkpoint=now if self._saved is None else None,
+            )
+        except Exception:
+            self._requeue(batch, names, opened, closed)
+            raise
+        return len(rows)
+
+    def _requeue(self, batch: dict, names: dict, opened: dict, closed: set) -> None:
+        """Remet un lot non écrit devant les changements arrivés depuis."""
+        for key, sec in batch.items():
+            self._pending[key] = self._pending.get(key, 0.0) + sec
+        self._names_pending = {**names, **self._names_pending}
+        # ordre du flush : fermetures puis ouvertures ; une fermeture récente l'emporte
+        self._opened = {**{k: v for k, v in opened.items() if k not in self._closed}, **self._opened}
+        self._closed = closed | self._closed
+
+    @tasks.loop(hours=COMPACT_HOURS)
+    async def _compact_loop(self):
+        # une exception terminerait la boucle (ex : base verrouillée par stats_cli import)
+        try:
+            await self.db.compact(time.time())
+        except Exception:
+            log.exception("Compactage de l'historique échoué, nouvel essai au prochain intervalle")
 
     # --------------------------------------------------------------------- #
     # Commandes
@@ -72,22 +250,21 @@ class StatsCog(commands.Cog):
         name="top-jeux",
         description="Classement des jeux les plus joués du serveur."
     )
-    @app_commands.describe(limite="Nombre de jeux à afficher (défaut 10)")
-    async def top_jeux(self, interaction: discord.Interaction, limite: Optional[int] = 10):
+    @app_commands.describe(limite="Nombre de jeux à afficher (défaut 10)", periode="Période (défaut: depuis le début)")
+    @app_commands.rename(periode="période")
+    @app_commands.choices(periode=PERIOD_CHOICES)
+    async def top_jeux(self, interaction: discord.Interaction, limite: Optional[int] = 10,
+                       periode: Optional[str] = None):
         assert interaction.guild, "À utiliser dans une guilde."
         limite = min(25, max(1, int(limite or 10)))
+        periode = periode or "tout"
 
-        rows = self._query(
-            """
-            SELECT game, SUM(seconds) AS total
-            FROM game_stats
-            WHERE guild_id = ?
-            GROUP BY game
-            ORDER BY total DESC
-            LIMIT ?
-            """,
-            (interaction.guild.id, limite),
-        )
+        if periode == "tout":
+            rows = await self.db.top_games(interaction.guild.id, limite)
+        else:
+            rows = await self.db.read(PERIOD_TOP_GAMES_SQL, {
+                "guild": interaction.guild.id, "limit": limite, **period_bounds(periode, time.time()),
+            })
 
         if not rows:
             return await interaction.response.send_message(
@@ -96,11 +273,14 @@ class StatsCog(commands.Cog):
 
         embed = discord.Embed(
             title=f"🏆 Top {len(rows)} jeux — {interaction.guild.name}",
+            description=PERIOD_LABELS[periode],
             color=discord.Color.blurple(),
         )
-        for i, (game, total) in enumerate(rows, start=1):
-            embed.add_field(name=f"{i}. {game}",
-                            value=_fmt_duration(total), inline=False)
+        for i, (game, total, players) in enumerate(rows, start=1):
+            value = _fmt_duration(total)
+            if players:   # inconnu sur une période
+                value += f" • {players} joueur{'s' if players > 1 else ''}"
+            embed.add_field(name=f"{i}. {game}", value=value, inline=False)
 
         await interaction.response.send_message(embed=embed)
 
@@ -111,34 +291,39 @@ class StatsCog(commands.Cog):
         name="stats-moi",
         description="Tes stats (ou celles d’un membre) par jeu."
     )
-    @app_commands.describe(membre="Membre ciblé (défaut: toi)")
-    async def stats_moi(self, interaction: discord.Interaction, membre: Optional[discord.Member] = None):
+    @app_commands.describe(membre="Membre ciblé (défaut: toi)", periode="Période (défaut: depuis le début)")
+    @app_commands.rename(periode="période")
+    @app_commands.choices(periode=PERIOD_CHOICES)
+    async def stats_moi(self, interaction: discord.Interaction, membre: Optional[discord.Member] = None,
+                        periode: Optional[str] = None):
         assert interaction.guild, "À utiliser dans une guilde."
         cible = membre or interaction.user
+        periode = periode or "tout"
 
-        rows = self._query(
-            """
-            SELECT game, seconds
-            FROM game_stats
-            WHERE guild_id = ? AND member_id = ?
-            ORDER BY seconds DESC
-            """,
-            (interaction.guild.id, cible.id),
-        )
+        if periode == "tout":
+            rows = await self.db.read(MEMBER_RANKS_SQL, (interaction.guild.id, cible.id))
+            total = rows[0][4] if rows else 0
+        else:   # pas de classement par période
+            rows = [(game, sec, None, None) for game, sec in await self.db.read(PERIOD_MEMBER_GAMES_SQL, {
+                "guild": interaction.guild.id, "member": cible.id, **period_bounds(periode, time.time()),
+            })]
+            total = sum(row[1] for row in rows)
 
         if not rows:
             return await interaction.response.send_message(
                 f"Aucune statistique trouvée pour **{cible.display_name}**.", ephemeral=True
             )
 
-        total = sum(sec for _, sec in rows)
         embed = discord.Embed(
             title=f"🎮 Stats — {cible.display_name}",
-            description=f"Temps cumulé: **{_fmt_duration(total)}**",
+            description=f"{PERIOD_LABELS[periode]} — temps cumulé: **{_fmt_duration(total)}**",
             color=discord.Color.green(),
         )
-        for game, sec in rows[:25]:
-            embed.add_field(name=game, value=_fmt_duration(sec), inline=False)
+        for game, sec, rank, players, *_ in rows[:25]:
+            value = _fmt_duration(sec)
+            if rank:
+                value += f" • #{rank} sur {players:,}".replace(",", "\u202f")
+            embed.add_field(name=game, value=value, inline=False)
 
         await interaction.response.send_message(embed=embed, ephemeral=(cible.id == interaction.user.id))
 
@@ -149,20 +334,23 @@ class StatsCog(commands.Cog):
         name="stats-jeu",
         description="Top membres pour un jeu donné."
     )
-    @app_commands.describe(jeu="Nom du jeu (texte exact)")
-    async def stats_jeu(self, interaction: discord.Interaction, jeu: str):
+    @app_commands.describe(jeu="Nom du jeu (majuscules et alias ignorés)", periode="Période (défaut: depuis le début)")
+    @app_commands.rename(periode="période")
+    @app_commands.choices(periode=PERIOD_CHOICES)
+    async def stats_jeu(self, interaction: discord.Interaction, jeu: str, periode: Optional[str] = None):
         assert interaction.guild, "À utiliser dans une guilde."
-
-        rows = self._query(
-            """
-            SELECT member_id, seconds
-            FROM game_stats
-            WHERE guild_id = ? AND LOWER(game) = LOWER(?)
-            ORDER BY seconds DESC
-            LIMIT 25
-            """,
-            (interaction.guild.id, jeu),
-        )
+        periode = periode or "tout"
+
+        found = await self.db.find_game(jeu)
+        rows = []
+        if found and periode == "tout":
+            rows = await self.db.read(GAME_PLAYERS_SQL, (interaction.guild.id, found[0]))
+        elif found:
+            rows = await self.db.read(PERIOD_GAME_PLAYERS_SQL, {
+                "guild": interaction.guild.id, "game": found[0], **period_bounds(periode, time.time()),
+            })
+        if found:
+            jeu = found[1]
 
         if not rows:
             return await interaction.response.send_message(
@@ -171,12 +359,13 @@ class StatsCog(commands.Cog):
 
         embed = discord.Embed(
             title=f"👥 Top joueurs — {jeu}",
+            description=PERIOD_LABELS[periode],
             color=discord.Color.orange(),
         )
 
-        for rank, (mid, sec) in enumerate(rows, start=1):
+        for rank, (mid, sec, known) in enumerate(rows, start=1):
             member = interaction.guild.get_member(mid)
-            name = member.display_name if member else f"Utilisateur {mid}"
+            name = member.display_name if member else (known or f"Utilisateur {mid}")
             embed.add_field(
                 name=f"{rank}. {name}",
                 value=_fmt_duration(sec),
@@ -185,6 +374,13 @@ class StatsCog(commands.Cog):
 
         await interaction.response.send_message(embed=embed)
 
+    @stats_jeu.autocomplete("jeu")
+    async def _jeu_autocomplete(self, interaction: discord.Interaction, current: str):
+        if not interaction.guild:
+            return []
+        index = await self.db.game_index(interaction.guild.id)
+        return [app_commands.Choice(name=name[:100], value=name[:100]) for name in index.search(current)]
+
     # ----------------------------------------------------------
 
     @app_commands.guilds(GUILD_OBJ)
@@ -195,27 +391,35 @@ class StatsCog(commands.Cog):
     )
     async def reset_stats(self, interaction: discord.Interaction):
         assert interaction.guild, "À utiliser dans une guilde."
-        self._exec("DELETE FROM game_stats WHERE guild_id = ?",
-                   (interaction.guild.id,))
+        self._forget_guild(interaction.guild.id, time.time())
+        await self.db.reset_guild(interaction.guild.id)
         await interaction.response.send_message("🗑️ Stats du serveur **réinitialisées**.", ephemeral=True)
 
+    # ----------------------------------------------------------
+
+    @app_commands.guilds(GUILD_OBJ)
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(
+        name="alias-jeu",
+        description="(Admin) Rattache un nom de jeu à un autre (les stats sont fusionnées)."
+    )
+    @app_commands.describe(alias="Nom à rattacher (ex: CS2)", jeu="Jeu de référence (ex: Counter-Strike 2)")
+    async def alias_jeu(self, interaction: discord.Interaction, alias: str, jeu: str):
+        await self.flush_playtime()
+        _, name = await self.db.add_alias(alias, jeu)
+        await interaction.response.send_message(f"🔗 **{alias}** est maintenant un alias de **{name}**.", ephemeral=True)
+
     # --------------------------------------------------------------------- #
     # API interne (facultatif) pour incrémenter les stats depuis d'autres cogs
     # --------------------------------------------------------------------- #
-    def add_playtime(self, guild_id: int, member_id: int, game: str, seconds: int) -> None:
-        """Incrémente les secondes jouées pour un membre et un jeu."""
+    def add_playtime(self, guild_id: int, member_id: int, game: str, seconds: float,
+                     day: Optional[int] = None) -> None:
+        """Incrémente les secondes jouées pour un membre et un jeu (écrit au prochain flush).
+        ``day`` (AAAAMMJJ UTC) : jour crédité, aujourd'hui par défaut."""
         if not game or seconds <= 0:
             return
-        with closing(sqlite3.connect(DB_PATH)) as conn, conn, closing(conn.cursor()) as cur:
-            cur.execute(
-                """
-                INSERT INTO game_stats (guild_id, member_id, game, seconds)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(guild_id, member_id, game)
-                DO UPDATE SET seconds = seconds + excluded.seconds
-                """,
-                (guild_id, member_id, game, int(seconds))
-            )
+        key = (guild_id, member_id, game, day or day_key(time.time()))
+        self._pending[key] = self._pending.get(key, 0.0) + seconds
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,796 @@
+# -*- coding: utf-8 -*-
+# cogs/stats_store.py
+import asyncio
+import heapq
+import os
+import queue
+import re
+import sqlite3
+import threading
+import unicodedata
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DB_PATH = os.path.join("data", "stats.db")
+READER_POOL_SIZE = 3
+STATEMENT_CACHE = 256   # requêtes préparées gardées par connexion
+DAILY_RETENTION_DAYS = 62      # au-delà, les jours sont compactés en mois
+MONTHLY_RETENTION_MONTHS = 24  # au-delà, l'historique mensuel est supprimé
+
+# Schéma v2 : jeux normalisés (+ alias), stats référencées par id
+_V2_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS games (
+        id    INTEGER PRIMARY KEY,
+        name  TEXT NOT NULL,               -- nom affiché (le plus joué à la migration)
+        norm  TEXT NOT NULL                -- clé normalisée (casefold, NFKC, espaces)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_games_norm ON games (norm)",
+    """
+    CREATE TABLE IF NOT EXISTS game_aliases (
+        norm     TEXT PRIMARY KEY,         -- clé normalisée de l'alias
+        game_id  INTEGER NOT NULL REFERENCES games (id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS game_stats (
+        guild_id   INTEGER NOT NULL,
+        member_id  INTEGER NOT NULL,
+        game_id    INTEGER NOT NULL REFERENCES games (id),
+        seconds    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, member_id, game_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_game_stats_game ON game_stats (guild_id, game_id, seconds)",
+)
+
+# Schéma v3 : totaux par (guilde, jeu) tenus à jour par triggers, donc dans
+# la même transaction que chaque écriture de game_stats (upsert, fusion, reset).
+_V3_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS guild_game_totals (
+        guild_id  INTEGER NOT NULL,
+        game_id   INTEGER NOT NULL,
+        seconds   INTEGER NOT NULL DEFAULT 0,
+        players   INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, game_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_totals_rank ON guild_game_totals (guild_id, seconds)",
+)
+_TOTALS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_game_stats_insert AFTER INSERT ON game_stats BEGIN
+        INSERT INTO guild_game_totals (guild_id, game_id, seconds, players)
+        VALUES (NEW.guild_id, NEW.game_id, NEW.seconds, 1)
+        ON CONFLICT(guild_id, game_id)
+        DO UPDATE SET seconds = seconds + excluded.seconds, players = players + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_game_stats_update AFTER UPDATE OF seconds ON game_stats BEGIN
+        UPDATE guild_game_totals SET seconds = seconds + NEW.seconds - OLD.seconds
+        WHERE guild_id = NEW.guild_id AND game_id = NEW.game_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_game_stats_delete AFTER DELETE ON game_stats BEGIN
+        UPDATE guild_game_totals SET seconds = seconds - OLD.seconds, players = players - 1
+        WHERE guild_id = OLD.guild_id AND game_id = OLD.game_id;
+        DELETE FROM guild_game_totals
+        WHERE guild_id = OLD.guild_id AND game_id = OLD.game_id AND players <= 0;
+    END
+    """,
+)
+_V3_SCHEMA += _TOTALS_TRIGGERS
+
+# Schéma v4 : historique par jour (jour = AAAAMMJJ UTC) puis par mois (AAAAMM).
+# Les index couvrants servent les filtres par membre et par jeu sur une plage.
+_V4_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS playtime_daily (
+        guild_id   INTEGER NOT NULL,
+        day        INTEGER NOT NULL,
+        member_id  INTEGER NOT NULL,
+        game_id    INTEGER NOT NULL,
+        seconds    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, day, member_id, game_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_daily_member ON playtime_daily (guild_id, member_id, day, game_id, seconds)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_game ON playtime_daily (guild_id, game_id, day, member_id, seconds)",
+    """
+    CREATE TABLE IF NOT EXISTS playtime_monthly (
+        guild_id   INTEGER NOT NULL,
+        month      INTEGER NOT NULL,
+        member_id  INTEGER NOT NULL,
+        game_id    INTEGER NOT NULL,
+        seconds    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, month, member_id, game_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_monthly_member ON playtime_monthly (guild_id, member_id, month, game_id, seconds)",
+    "CREATE INDEX IF NOT EXISTS idx_monthly_game ON playtime_monthly (guild_id, game_id, month, member_id, seconds)",
+)
+# Schéma v5 : sessions ouvertes (créditées jusqu'au point de contrôle global)
+_V5_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS open_sessions (
+        guild_id    INTEGER NOT NULL,
+        member_id   INTEGER NOT NULL,
+        game        TEXT    NOT NULL,      -- nom tel que vu dans la présence
+        started_at  REAL    NOT NULL,
+        PRIMARY KEY (guild_id, member_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+        key    TEXT PRIMARY KEY,
+        value
+    ) WITHOUT ROWID
+    """,
+)
+
+# Schéma v6 : dernier nom d'affichage connu des membres (classements)
+_V6_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS members (
+        guild_id      INTEGER NOT NULL,
+        member_id     INTEGER NOT NULL,
+        display_name  TEXT    NOT NULL,
+        updated_at    REAL    NOT NULL,
+        PRIMARY KEY (guild_id, member_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# tables de temps de jeu et leur clé (hors game_id), pour fusions et resets
+_PLAYTIME_TABLES = (
+    ("game_stats", "guild_id, member_id"),
+    ("playtime_daily", "guild_id, day, member_id"),
+    ("playtime_monthly", "guild_id, month, member_id"),
+)
+
+# --------------------------------------------------------------------- #
+# Requêtes (texte constant → instruction préparée réutilisée par sqlite3)
+# --------------------------------------------------------------------- #
+UPSERT_PLAYTIME = """
+INSERT INTO game_stats (guild_id, member_id, game_id, seconds)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(guild_id, member_id, game_id)
+DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+UPSERT_DAILY = """
+INSERT INTO playtime_daily (guild_id, day, member_id, game_id, seconds)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(guild_id, day, member_id, game_id)
+DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+UPSERT_MONTHLY = """
+INSERT INTO playtime_monthly (guild_id, month, member_id, game_id, seconds)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(guild_id, month, member_id, game_id)
+DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+COMPACT_DAILY_SQL = """
+INSERT INTO playtime_monthly (guild_id, month, member_id, game_id, seconds)
+SELECT guild_id, day / 100, member_id, game_id, SUM(seconds)
+FROM playtime_daily WHERE day < ?
+GROUP BY guild_id, day / 100, member_id, game_id
+ON CONFLICT(guild_id, month, member_id, game_id)
+DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+UPSERT_SESSION = """
+INSERT INTO open_sessions (guild_id, member_id, game, started_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(guild_id, member_id) DO UPDATE SET game = excluded.game, started_at = excluded.started_at
+"""
+DELETE_SESSION = "DELETE FROM open_sessions WHERE guild_id = ? AND member_id = ?"
+UPSERT_MEMBER = """
+INSERT INTO members (guild_id, member_id, display_name, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(guild_id, member_id) DO UPDATE SET display_name = excluded.display_name, updated_at = excluded.updated_at
+"""
+SET_META = "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+
+FIND_GAME_SQL = """
+SELECT g.id, g.name FROM game_aliases a JOIN games g ON g.id = a.game_id WHERE a.norm = ?
+UNION ALL
+SELECT id, name FROM games WHERE norm = ?
+LIMIT 1
+"""
+
+TOP_GAMES_SQL = """
+SELECT g.name, t.seconds, t.players
+FROM guild_game_totals t JOIN games g ON g.id = t.game_id
+WHERE t.guild_id = ?
+ORDER BY t.seconds DESC
+LIMIT ?
+"""
+TOP_GAMES_CACHED = 25   # taille du classement gardé en cache par guilde
+
+# 25 jeux les plus joués du membre avec, pour chacun, son rang (nombre de joueurs
+# devant lui sur idx_game_stats_game, une courte plage d'index par jeu) et le
+# nombre de joueurs du rollup ; le total porte sur tous ses jeux.
+MEMBER_RANKS_SQL = """
+SELECT g.name, s.seconds,
+       1 + (SELECT COUNT(*) FROM game_stats o
+            WHERE o.guild_id = s.guild_id AND o.game_id = s.game_id AND o.seconds > s.seconds) AS rank,
+       t.players, s.total
+FROM (
+    SELECT guild_id, game_id, seconds, SUM(seconds) OVER () AS total
+    FROM game_stats
+    WHERE guild_id = ? AND member_id = ?
+    ORDER BY seconds DESC
+    LIMIT 25
+) s
+JOIN games g ON g.id = s.game_id
+JOIN guild_game_totals t ON t.guild_id = s.guild_id AND t.game_id = s.game_id
+ORDER BY s.seconds DESC
+"""
+
+# nom d'affichage connu joint pour les membres absents du cache discord.py
+GAME_PLAYERS_SQL = """
+SELECT s.member_id, s.seconds, n.display_name
+FROM game_stats s
+LEFT JOIN members n ON n.guild_id = s.guild_id AND n.member_id = s.member_id
+WHERE s.guild_id = ? AND s.game_id = ?
+ORDER BY s.seconds DESC
+LIMIT 25
+"""
+
+# Périodes : mois compactés (month >= ?) + jours encore détaillés (day >= ?).
+# Une ligne est soit dans playtime_daily soit dans playtime_monthly : pas de doublon.
+_PERIOD_ROWS = """
+WITH p (member_id, game_id, seconds) AS (
+    SELECT member_id, game_id, seconds FROM playtime_monthly
+    WHERE guild_id = :guild AND month >= :month {filter}
+    UNION ALL
+    SELECT member_id, game_id, seconds FROM playtime_daily
+    WHERE guild_id = :guild AND day >= :day {filter}
+)
+"""
+
+# Classement : chaque table est agrégée par jeu dans l'ordre de idx_*_game (sans
+# matérialiser les lignes), puis les deux sommes sont fusionnées ; la table mensuelle
+# est sautée d'emblée pour les périodes courtes. Le nombre de joueurs distincts
+# n'est pas additif entre mois : NULL ici.
+PERIOD_TOP_GAMES_SQL = """
+SELECT g.name, SUM(t.seconds) AS total, NULL
+FROM (
+    SELECT game_id, SUM(seconds) AS seconds FROM playtime_monthly
+    WHERE :month < 999999 AND guild_id = :guild AND month >= :month GROUP BY game_id
+    UNION ALL
+    SELECT game_id, SUM(seconds) FROM playtime_daily
+    WHERE guild_id = :guild AND day >= :day GROUP BY game_id
+) t JOIN games g ON g.id = t.game_id
+GROUP BY t.game_id
+ORDER BY total DESC
+LIMIT :limit
+"""
+
+PERIOD_MEMBER_GAMES_SQL = _PERIOD_ROWS.format(filter="AND member_id = :member") + """
+SELECT g.name, SUM(p.seconds) AS total
+FROM p JOIN games g ON g.id = p.game_id
+GROUP BY p.game_id
+ORDER BY total DESC
+"""
+
+PERIOD_GAME_PLAYERS_SQL = _PERIOD_ROWS.format(filter="AND game_id = :game") + """
+SELECT t.member_id, t.total, n.display_name
+FROM (SELECT member_id, SUM(seconds) AS total FROM p GROUP BY member_id ORDER BY total DESC LIMIT 25) t
+LEFT JOIN members n ON n.guild_id = :guild AND n.member_id = t.member_id
+ORDER BY t.total DESC
+"""
+
+# période -> jours couverts (None = 12 derniers mois calendaires)
+PERIODS: Dict[str, Optional[int]] = {"7j": 7, "30j": 30, "12m": None}
+_NO_MONTH = 999999   # borne qui exclut la table mensuelle (cf. PERIOD_TOP_GAMES_SQL)
+
+GAME_INDEX_SQL = """
+SELECT t.game_id, g.name, t.seconds
+FROM guild_game_totals t JOIN games g ON g.id = t.game_id
+WHERE t.guild_id = ?
+"""
+ALIASES_SQL = "SELECT norm, game_id FROM game_aliases"
+
+_MARKS = re.compile(r"[\u2122\u00ae\u00a9]")   # ™ ® ©
+_SPACES = re.compile(r"\s+")
+_WORD_START = re.compile(r"\b\w")
+
+
+def normalize_game(name: str) -> str:
+    """Clé de jeu insensible à la casse : « VALORANT™ » et « Valorant » → « valorant »."""
+    s = unicodedata.normalize("NFKC", _MARKS.sub("", name or ""))
+    return _SPACES.sub(" ", s).strip().casefold()
+
+
+def day_key(ts: float) -> int:
+    d = datetime.fromtimestamp(ts, timezone.utc)
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def split_days(start: float, end: float) -> Iterator[Tuple[int, float]]:
+    """Découpe [start, end) en (jour, secondes) aux minuits UTC."""
+    while start < end:
+        midnight = (int(start // 86400) + 1) * 86400
+        yield day_key(start), min(end, midnight) - start
+        start = midnight
+
+
+def _months_back(ts: float, months: int) -> int:
+    d = datetime.fromtimestamp(ts, timezone.utc)
+    index = d.year * 12 + d.month - 1 - months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def period_bounds(period: str, now: float) -> Dict[str, int]:
+    """Paramètres :month / :day des requêtes PERIOD_* pour ``period`` (clé de PERIODS)."""
+    days = PERIODS[period]
+    if days is not None:   # toujours dans la rétention journalière
+        return {"month": _NO_MONTH, "day": day_key(now - (days - 1) * 86400)}
+    month = _months_back(now, 11)
+    return {"month": month, "day": month * 100 + 1}
+
+
+def connect(path: str = DB_PATH, *, readonly: bool = False) -> sqlite3.Connection:
+    """Connexion longue durée configurée pour le WAL."""
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=STATEMENT_CACHE)
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if readonly:
+        conn.execute("PRAGMA query_only=1")
+    return conn
+
+
+def open_db(path: str = DB_PATH) -> sqlite3.Connection:
+    """Ouvre la base en écriture, active le WAL, crée le schéma et migre l'existant."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    _migrate(conn)
+    return conn
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _v2_games(conn: sqlite3.Connection) -> None:
+    # v1 : game_stats(guild_id, member_id, game TEXT, seconds) → table des jeux normalisée
+    legacy = "game" in _columns(conn, "game_stats")
+    if legacy:
+        conn.execute("ALTER TABLE game_stats RENAME TO game_stats_v1")
+    for stmt in _V2_SCHEMA:
+        conn.execute(stmt)
+    if not legacy:
+        return
+    conn.execute("CREATE TEMP TABLE game_map (game TEXT PRIMARY KEY, game_id INTEGER NOT NULL)")
+    ids: Dict[str, int] = {}
+    names = [row[0] for row in conn.execute(
+        "SELECT game, SUM(seconds) FROM game_stats_v1 GROUP BY game ORDER BY 2 DESC")]
+    for name in names:
+        conn.execute("INSERT INTO game_map VALUES (?, ?)", (name, resolve_game(conn, name, ids)))
+    conn.execute(
+        """
+        INSERT INTO game_stats (guild_id, member_id, game_id, seconds)
+        SELECT l.guild_id, l.member_id, m.game_id, SUM(l.seconds)
+        FROM game_stats_v1 l JOIN game_map m ON m.game = l.game
+        GROUP BY l.guild_id, l.member_id, m.game_id
+        """
+    )
+    conn.execute("DROP TABLE game_map")
+    conn.execute("DROP TABLE game_stats_v1")
+
+
+def _v3_totals(conn: sqlite3.Connection) -> None:
+    for stmt in _V3_SCHEMA:
+        conn.execute(stmt)
+    conn.execute(
+        """
+        INSERT INTO guild_game_totals (guild_id, game_id, seconds, players)
+        SELECT guild_id, game_id, SUM(seconds), COUNT(*) FROM game_stats GROUP BY guild_id, game_id
+        """
+    )
+
+
+def _v4_history(conn: sqlite3.Connection) -> None:
+    # pas d'historique avant cette version : game_stats reste le cumul « tout »
+    for stmt in _V4_SCHEMA:
+        conn.execute(stmt)
+
+
+def _v5_sessions(conn: sqlite3.Connection) -> None:
+    for stmt in _V5_SCHEMA:
+        conn.execute(stmt)
+
+
+def _v6_members(conn: sqlite3.Connection) -> None:
+    for stmt in _V6_SCHEMA:
+        conn.execute(stmt)
+
+
+# (version, étape) appliquées dans l'ordre, chacune dans sa transaction
+_MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (2, _v2_games),
+    (3, _v3_totals),
+    (4, _v4_history),
+    (5, _v5_sessions),
+    (6, _v6_members),
+]
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, step in _MIGRATIONS:
+        if version >= target:
+            continue
+        conn.execute("BEGIN")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        version = target
+
+
+def bulk_add_stats(conn: sqlite3.Connection, rows: Iterable[Tuple[int, int, int, int]] = (), *,
+                   select: Optional[str] = None, args: Iterable = ()) -> None:
+    """Ajoute en masse (guild_id, member_id, game_id, secondes) à game_stats, dans la
+    transaction ouverte par l'appelant : ``rows``, ou les lignes d'une requête ``select``
+    (paramètres ``args``, sans clé en double). Les triggers du rollup (un upsert par ligne) sont suspendus ;
+    guild_game_totals est mis à jour en une passe ensembliste, puis les triggers sont
+    recréés avant le commit : les autres connexions ne voient rien."""
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS bulk_stats (guild_id INTEGER, member_id INTEGER, game_id INTEGER, "
+        "seconds INTEGER, PRIMARY KEY (guild_id, member_id, game_id)) WITHOUT ROWID"
+    )
+    if select is not None:
+        conn.execute(f"INSERT INTO bulk_stats {select}", tuple(args))
+    else:
+        conn.executemany(
+            "INSERT INTO bulk_stats VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET seconds = seconds + excluded.seconds",
+            rows,
+        )
+    for name in ("trg_game_stats_insert", "trg_game_stats_update", "trg_game_stats_delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    # joueurs ajoutés = lignes absentes de game_stats avant l'import
+    conn.execute(
+        """
+        INSERT INTO guild_game_totals (guild_id, game_id, seconds, players)
+        SELECT b.guild_id, b.game_id, SUM(b.seconds), SUM(s.member_id IS NULL)
+        FROM bulk_stats b LEFT JOIN game_stats s
+          ON s.guild_id = b.guild_id AND s.member_id = b.member_id AND s.game_id = b.game_id
+        GROUP BY b.guild_id, b.game_id
+        ON CONFLICT(guild_id, game_id)
+        DO UPDATE SET seconds = seconds + excluded.seconds, players = players + excluded.players
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO game_stats (guild_id, member_id, game_id, seconds)
+        SELECT guild_id, member_id, game_id, seconds FROM bulk_stats WHERE true
+        ON CONFLICT(guild_id, member_id, game_id) DO UPDATE SET seconds = seconds + excluded.seconds
+        """
+    )
+    for stmt in _TOTALS_TRIGGERS:
+        conn.execute(stmt)
+    conn.execute("DELETE FROM bulk_stats")
+
+
+def resolve_game(conn: sqlite3.Connection, name: str, cache: Dict[str, int]) -> int:
+    """Id du jeu (alias compris) ; le crée s'il est inconnu. ``cache`` : norm -> id."""
+    norm = normalize_game(name)
+    game_id = cache.get(norm)
+    if game_id is not None:
+        return game_id
+    row = conn.execute(FIND_GAME_SQL, (norm, norm)).fetchone()
+    if row is None:
+        game_id = conn.execute("INSERT INTO games (name, norm) VALUES (?, ?)",
+                               (name.strip(), norm)).lastrowid
+    else:
+        game_id = row[0]
+    cache[norm] = game_id
+    return game_id
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, args: Iterable = ()) -> List[str]:
+    """Détails de EXPLAIN QUERY PLAN (pour vérifier l'usage des index)."""
+    args = args if isinstance(args, dict) else tuple(args)
+    return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, args)]
+
+
+def _word_keys(norm: str) -> Iterator[str]:
+    """Clés de recherche : la chaîne à partir de chaque début de mot."""
+    for m in _WORD_START.finditer(norm):
+        yield norm[m.start():]
+
+
+class GamePrefixIndex:
+    """
+    Jeux d'une guilde cherchables par début de mot (alias compris) : liste triée
+    de (clé normalisée, game_id) parcourue par bisect, résultats classés par
+    temps total. Aucune requête SQL par frappe.
+    """
+
+    def __init__(self, games: Iterable[Tuple[int, str, int]], aliases: Iterable[Tuple[str, int]] = ()):
+        self.names: Dict[int, str] = {}
+        self.totals: Dict[int, int] = {}
+        keys = set()
+        for game_id, name, seconds in games:
+            self.names[game_id] = name
+            self.totals[game_id] = seconds
+            keys.update((k, game_id) for k in _word_keys(normalize_game(name)))
+        for norm, game_id in aliases:
+            if game_id in self.names:
+                keys.update((k, game_id) for k in _word_keys(norm))
+        self._keys = sorted(keys)
+
+    def bump(self, game_id: int, seconds: int) -> bool:
+        """Ajoute du temps à un jeu connu ; False si le jeu est absent (index à reconstruire)."""
+        if game_id not in self.totals:
+            return False
+        self.totals[game_id] += seconds
+        return True
+
+    def search(self, text: str, limit: int = 25) -> List[str]:
+        norm = normalize_game(text)
+        if not norm:
+            ids: Iterable[int] = self.totals
+        else:
+            ids = set()
+            i = bisect_left(self._keys, (norm,))
+            while i < len(self._keys) and self._keys[i][0].startswith(norm):
+                ids.add(self._keys[i][1])
+                i += 1
+        return [self.names[g] for g in heapq.nlargest(limit, ids, key=self.totals.__getitem__)]
+
+
+def _resolve(fut: asyncio.Future, result: Any = None, exc: Optional[BaseException] = None) -> None:
+    if fut.cancelled():
+        return
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(result)
+
+
+class StatsStore:
+    """
+    Accès SQLite partagé pour les stats :
+    - un thread écrivain dédié (une connexion, une transaction par tâche) ;
+    - un pool de lecteurs (une connexion en lecture seule par thread) ;
+    tout est exposé sous forme d'awaitables : la boucle asyncio ne bloque jamais.
+    """
+
+    def __init__(self, path: str = DB_PATH, *, readers: int = READER_POOL_SIZE):
+        self.path = path
+        self._writer_conn = open_db(path)
+        self._jobs: "queue.Queue[Optional[Tuple[Callable, asyncio.Future, asyncio.AbstractEventLoop]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="stats-writer", daemon=True)
+        self._writer.start()
+        self._game_ids: Dict[str, int] = {}   # cache norm -> id (thread écrivain uniquement)
+        # classement par guilde, invalidé à chaque écriture (génération)
+        self._top_cache: Dict[int, list[tuple]] = {}
+        self._indexes: Dict[int, GamePrefixIndex] = {}   # autocomplétion par guilde
+        self._generation = 0
+        self._data_version: Optional[int] = None   # PRAGMA data_version vu par l'écrivain
+        self._local = threading.local()
+        self._reader_conns: list[sqlite3.Connection] = []
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="stats-reader")
+
+    # ----------------------------- Écritures ----------------------------- #
+
+    def _writer_loop(self) -> None:
+        conn = self._writer_conn
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, fut, loop = job
+            try:
+                with conn:
+                    result = fn(conn)
+            except BaseException as exc:  # transmis à l'appelant
+                # jeux créés dans la transaction annulée : leurs id peuvent être réattribués
+                self._game_ids.clear()
+                loop.call_soon_threadsafe(_resolve, fut, None, exc)
+            else:
+                loop.call_soon_threadsafe(_resolve, fut, result)
+        conn.close()
+
+    def _invalidate(self, guild_ids: Optional[Iterable[int]] = None) -> None:
+        self._generation += 1
+        if guild_ids is None:
+            self._top_cache.clear()
+        else:
+            for gid in guild_ids:
+                self._top_cache.pop(gid, None)
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], Any], *,
+                          guild_ids: Optional[Iterable[int]] = None) -> Any:
+        """Exécute ``fn(conn)`` dans une transaction du thread écrivain.
+        ``guild_ids`` : guildes touchées (None = toutes) pour invalider les caches."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._jobs.put((fn, fut, loop))
+        try:
+            return await fut
+        finally:
+            self._invalidate(guild_ids)
+
+    async def sync_external(self) -> bool:
+        """Vide les caches si un autre processus (ex : stats_cli import) a écrit dans la
+        base depuis le dernier appel. ``PRAGMA data_version`` de la connexion écrivain ne
+        change qu'avec les commits des autres connexions. Retourne True si invalidé."""
+
+        def run(conn: sqlite3.Connection) -> bool:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            changed = self._data_version is not None and version != self._data_version
+            self._data_version = version
+            if changed:
+                self._game_ids.clear()   # thread écrivain : seul à utiliser ce cache
+            return changed
+        changed = await self.transaction(run, guild_ids=())
+        if changed:
+            self._invalidate()
+            self._indexes.clear()
+        return changed
+
+    async def write(self, sql: str, args: Iterable = ()) -> int:
+        return await self.transaction(lambda conn: conn.execute(sql, tuple(args)).rowcount)
+
+    async def add_playtime(self, rows: Iterable[Tuple[int, int, str, int, int]], *,
+                           opened: Iterable[Tuple[int, int, str, float]] = (),
+                           closed: Iterable[Tuple[int, int]] = (),
+                           members: Iterable[Tuple[int, int, str, float]] = (),
+                           checkpoint: Optional[float] = None) -> int:
+        """Ajoute (guild_id, member_id, nom du jeu, secondes, jour) en une transaction :
+        cumul (game_stats) et historique journalier. Dans la même transaction :
+        sessions ouvertes/fermées depuis le dernier appel et point de contrôle
+        (instant jusqu'où les sessions ouvertes sont créditées), et noms d'affichage
+        (guild_id, member_id, nom, instant) qui ont changé."""
+        rows, opened, closed, members = list(rows), list(opened), list(closed), list(members)
+
+        def run(conn: sqlite3.Connection) -> list[tuple]:
+            resolved = [(g, m, resolve_game(conn, game, self._game_ids), sec, day)
+                        for g, m, game, sec, day in rows]
+            conn.executemany(UPSERT_PLAYTIME, [(g, m, gid, sec) for g, m, gid, sec, _ in resolved])
+            conn.executemany(UPSERT_DAILY, [(g, day, m, gid, sec) for g, m, gid, sec, day in resolved])
+            conn.executemany(DELETE_SESSION, closed)
+            conn.executemany(UPSERT_SESSION, opened)
+            conn.executemany(UPSERT_MEMBER, members)
+            if checkpoint is not None:
+                conn.execute(SET_META, ("checkpoint", checkpoint))
+            return resolved
+        resolved = await self.transaction(run, guild_ids={r[0] for r in rows})
+        for g, _, game_id, sec, _ in resolved:
+            index = self._indexes.get(g)
+            if index is not None and not index.bump(game_id, sec):
+                del self._indexes[g]   # nouveau jeu : reconstruit à la prochaine recherche
+        return len(resolved)
+
+    async def add_alias(self, alias: str, canonical: str) -> Tuple[int, str]:
+        """Rattache ``alias`` au jeu ``canonical`` ; fusionne les stats si l'alias existait comme jeu."""
+
+        def run(conn: sqlite3.Connection) -> Tuple[int, str]:
+            target = resolve_game(conn, canonical, self._game_ids)
+            norm = normalize_game(alias)
+            row = conn.execute("SELECT id FROM games WHERE norm = ?", (norm,)).fetchone()
+            if row and row[0] != target:
+                old = row[0]
+                for table, key in _PLAYTIME_TABLES:
+                    conn.execute(
+                        f"""
+                        INSERT INTO {table} ({key}, game_id, seconds)
+                        SELECT {key}, ?, seconds FROM {table} WHERE game_id = ?
+                        ON CONFLICT({key}, game_id)
+                        DO UPDATE SET seconds = seconds + excluded.seconds
+                        """,
+                        (target, old),
+                    )
+                    conn.execute(f"DELETE FROM {table} WHERE game_id = ?", (old,))
+                conn.execute("UPDATE game_aliases SET game_id = ? WHERE game_id = ?", (target, old))
+                conn.execute("DELETE FROM games WHERE id = ?", (old,))
+            if row is None or row[0] != target:
+                conn.execute("INSERT OR REPLACE INTO game_aliases (norm, game_id) VALUES (?, ?)", (norm, target))
+            # l'alias peut avoir été mis en cache vers l'ancien id
+            self._game_ids.clear()
+            return target, conn.execute("SELECT name FROM games WHERE id = ?", (target,)).fetchone()[0]
+        result = await self.transaction(run)
+        self._indexes.clear()
+        return result
+
+    async def reset_guild(self, guild_id: int) -> None:
+        """Supprime le cumul, l'historique, les sessions ouvertes et les noms d'une guilde."""
+
+        def run(conn: sqlite3.Connection) -> None:
+            for table in (*(t for t, _ in _PLAYTIME_TABLES), "open_sessions", "members"):
+                conn.execute(f"DELETE FROM {table} WHERE guild_id = ?", (guild_id,))
+        await self.transaction(run, guild_ids=(guild_id,))
+        self._indexes.pop(guild_id, None)
+
+    async def compact(self, now: float) -> Tuple[int, int]:
+        """Rétention : jours anciens → mois, mois trop anciens supprimés.
+        Retourne (lignes journalières compactées, lignes mensuelles supprimées)."""
+        day_cutoff = day_key(now - DAILY_RETENTION_DAYS * 86400)
+        month_cutoff = _months_back(now, MONTHLY_RETENTION_MONTHS)
+
+        def run(conn: sqlite3.Connection) -> Tuple[int, int]:
+            conn.execute(COMPACT_DAILY_SQL, (day_cutoff,))
+            moved = conn.execute("DELETE FROM playtime_daily WHERE day < ?", (day_cutoff,)).rowcount
+            dropped = conn.execute("DELETE FROM playtime_monthly WHERE month < ?", (month_cutoff,)).rowcount
+            return moved, dropped
+        # le cumul (game_stats) n'est pas touché : aucun cache à invalider
+        return await self.transaction(run, guild_ids=())
+
+    # ------------------------------ Lectures ----------------------------- #
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, readonly=True)
+            self._reader_conns.append(conn)
+        return conn
+
+    def _read(self, sql: str, args: Any) -> list[tuple]:
+        return self._reader().execute(sql, args).fetchall()
+
+    async def read(self, sql: str, args: Iterable = ()) -> list[tuple]:
+        """``args`` : séquence (``?``) ou dict (paramètres nommés)."""
+        loop = asyncio.get_running_loop()
+        args = dict(args) if isinstance(args, dict) else tuple(args)
+        return await loop.run_in_executor(self._readers, self._read, sql, args)
+
+    async def top_games(self, guild_id: int, limit: int) -> list[tuple]:
+        """[(nom, secondes, joueurs)] : lecture ponctuelle du rollup, servie par le cache."""
+        rows = self._top_cache.get(guild_id)
+        if rows is None:
+            generation = self._generation
+            rows = await self.read(TOP_GAMES_SQL, (guild_id, TOP_GAMES_CACHED))
+            if generation == self._generation:   # pas d'écriture entre-temps
+                self._top_cache[guild_id] = rows
+        return rows[:limit]
+
+    async def load_sessions(self) -> Tuple[Optional[float], list[tuple]]:
+        """(point de contrôle, [(guild_id, member_id, jeu, started_at)]) laissés par le dernier arrêt."""
+        row = await self.read("SELECT value FROM meta WHERE key = 'checkpoint'")
+        sessions = await self.read("SELECT guild_id, member_id, game, started_at FROM open_sessions")
+        return (row[0][0] if row else None), sessions
+
+    async def game_index(self, guild_id: int) -> GamePrefixIndex:
+        """Index de recherche des jeux de la guilde, construit au premier appel."""
+        index = self._indexes.get(guild_id)
+        if index is None:
+            generation = self._generation
+            games = await self.read(GAME_INDEX_SQL, (guild_id,))
+            index = GamePrefixIndex(games, await self.read(ALIASES_SQL))
+            if generation == self._generation:
+                self._indexes[guild_id] = index
+        return index
+
+    async def find_game(self, name: str) -> Optional[Tuple[int, str]]:
+        """(id, nom affiché) du jeu correspondant à ``name`` (alias compris)."""
+        norm = normalize_game(name)
+        rows = await self.read(FIND_GAME_SQL, (norm, norm))
+        return rows[0] if rows else None
+
+    # ------------------------------------------------------------------- #
+
+    def close(self) -> None:
+        """Vide la file d'écriture puis ferme toutes les connexions."""
+        self._jobs.put(None)
+        self._writer.join()
+        self._readers.shutdown(wait=True)
+        for conn in self._reader_conns:
+            conn.close()
+        self._reader_conns.clear()
@@ -1,14 +1,17 @@
 import discord
 from discord import ActivityType
 
+def current_game(member: discord.Member) -> str | None:
+    """Nom du jeu en cours (activité « Joue à »), sinon None."""
+    for act in member.activities:
+        if act.type == ActivityType.playing and act.name:
+            return act.name
+    return None
+
 def build_channel_name(member: discord.Member) -> str:
     """Construit le nom du vocal avec jeu si détecté."""
     display = member.display_name
-    game = None
-    for act in member.activities:
-        if act.type == ActivityType.playing and act.name:
-            game = act.name
-            break
+    game = current_game(member)
     return f"🎮 {display} — {game}" if game else f"🎮 {display}"
 
 def control_embed(member: discord.Member, channel: discord.VoiceChannel) -> discord.Embed:
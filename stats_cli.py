@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# stats_cli.py
+"""
+Outils hors-ligne pour data/stats.db (aucune connexion Discord) :
+
+    python stats_cli.py export game_stats stats.csv          # ou .jsonl, « - » = stdout
+    python stats_cli.py import playtime_daily jours.jsonl    # ajoute le temps aux lignes existantes
+    python stats_cli.py snapshot sauvegarde.db               # copie cohérente, bot en marche
+
+Les jeux sont exportés par nom (les id diffèrent d'une base à l'autre) et
+résolus à l'import, alias compris. Export et import travaillent par lots :
+mémoire constante quelle que soit la taille de la table. L'import est validé
+en entier avant la première écriture ; le bot en marche le détecte tout seul
+(StatsStore.sync_external).
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import time
+from contextlib import closing, nullcontext
+from itertools import islice
+from operator import itemgetter
+from typing import ContextManager, Dict, Iterable, Iterator, TextIO, Tuple
+
+from cogs import stats_store as st
+
+EXPORT_BATCH = 10_000    # lignes lues par fetchmany
+IMPORT_BATCH = 100_000   # lignes par transaction : le bot n'attend jamais plus d'un lot
+IMPORT_CACHE_KIB = 256 * 1024
+
+# table -> colonnes de clé avant le jeu (ordre de la clé primaire)
+TABLES: Dict[str, tuple] = {
+    "game_stats": ("guild_id", "member_id"),
+    "playtime_daily": ("guild_id", "day", "member_id"),
+    "playtime_monthly": ("guild_id", "month", "member_id"),
+}
+
+
+def _columns(table: str) -> list[str]:
+    return [*TABLES[table], "game", "seconds"]
+
+
+def _format(path: str, forced: str | None) -> str:
+    if forced:
+        return forced
+    return "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+
+
+def _open(path: str, mode: str) -> ContextManager[TextIO]:
+    if path == "-":   # flux standards : à ne pas fermer en sortie de with
+        return nullcontext(sys.stdout if "w" in mode else sys.stdin)
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+# --------------------------------------------------------------------- #
+# Export
+# --------------------------------------------------------------------- #
+def export_rows(conn: sqlite3.Connection, table: str) -> Iterator[tuple]:
+    keys = TABLES[table]
+    cur = conn.execute(
+        f"SELECT {', '.join('t.' + k for k in keys)}, g.name, t.seconds "
+        f"FROM {table} t JOIN games g ON g.id = t.game_id "
+        f"ORDER BY {', '.join('t.' + k for k in keys)}, t.game_id"
+    )
+    while True:
+        batch = cur.fetchmany(EXPORT_BATCH)
+        if not batch:
+            return
+        yield from batch
+
+
+def export(db: str, table: str, path: str, fmt: str) -> int:
+    columns = _columns(table)
+    count = 0
+    with closing(st.connect(db, readonly=True)) as conn, _open(path, "w") as out:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in export_rows(conn, table):
+                writer.writerow(row)
+                count += 1
+        else:
+            # gabarit par table : seul le nom du jeu passe par json.dumps
+            line = "{" + ", ".join(f'"{c}": %s' for c in columns) + "}\n"
+            dumps = json.JSONEncoder(ensure_ascii=False).encode
+            for row in export_rows(conn, table):
+                out.write(line % (*row[:-2], dumps(row[-2]), row[-1]))
+                count += 1
+    return count
+
+
+# --------------------------------------------------------------------- #
+# Import
+# --------------------------------------------------------------------- #
+def _batches(items: Iterable, size: int = IMPORT_BATCH) -> Iterator[list]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def read_rows(stream: TextIO, table: str, fmt: str) -> Tuple[str, Iterator[Iterable[tuple]]]:
+    """(INSERT vers import_raw, lots de paramètres). Les lignes restent brutes : SQLite
+    convertit les nombres (affinité INTEGER) et lit le JSON (json_each, ->>), en C."""
+    columns = _columns(table)
+    if fmt == "jsonl":
+        # un lot = un seul tableau JSON, un seul paramètre
+        fields = ", ".join(f"value ->> '{c}'" for c in columns)
+        lines = (line for line in stream if line.strip())
+        return (f"INSERT INTO import_raw SELECT {fields} FROM json_each(?)",
+                ([("[" + ",".join(batch) + "]",)] for batch in _batches(lines)))
+    records = csv.reader(stream)
+    header = next(records, [])
+    missing = set(columns) - set(header)
+    if missing:
+        raise SystemExit(f"❌ Colonnes manquantes : {', '.join(sorted(missing))}")
+    sql = f"INSERT INTO import_raw VALUES ({', '.join('?' * len(columns))})"
+    if header != columns:
+        records = map(itemgetter(*(header.index(k) for k in columns)), records)
+    return sql, _batches(records)
+
+
+def _merge_sql(table: str) -> str:
+    """Tranche de rowid de import_raw → ``table`` : regroupée et triée dans l'ordre de la
+    clé primaire."""
+    keys = ", ".join(f"r.{k}" for k in TABLES[table])
+    select = (f"SELECT {keys}, g.game_id, SUM(r.seconds) "
+              f"FROM import_raw r JOIN import_games g ON g.name = r.game WHERE r.rowid BETWEEN ? AND ? "
+              f"GROUP BY {keys}, g.game_id ORDER BY {keys}, g.game_id")
+    if table == "game_stats":
+        return select
+    return (f"INSERT INTO {table} ({', '.join(TABLES[table])}, game_id, seconds) {select} "
+            f"ON CONFLICT DO UPDATE SET seconds = seconds + excluded.seconds")
+
+
+def import_rows(conn: sqlite3.Connection, table: str, sql: str, batches: Iterable[Iterable[tuple]]) -> int:
+    """Charge tout ``batches`` dans une table temporaire sans index, la valide, puis
+    fusionne vers ``table`` par transactions de IMPORT_BATCH lignes (un seul INSERT …
+    SELECT trié chacune). Un fichier invalide n'écrit rien. Retourne le nombre de lignes."""
+    columns = _columns(table)
+    invalid = " OR ".join([f"typeof({c}) != 'integer'" for c in columns if c != "game"] + ["game IS NULL"])
+    merge = _merge_sql(table)
+    conn.execute(f"PRAGMA cache_size=-{IMPORT_CACHE_KIB}")
+    conn.execute(f"CREATE TEMP TABLE import_raw ({', '.join(c + (' TEXT' if c == 'game' else ' INTEGER') for c in columns)})")
+    conn.execute("CREATE TEMP TABLE import_games (name TEXT PRIMARY KEY, game_id INTEGER NOT NULL) WITHOUT ROWID")
+    # 1) base temporaire uniquement : aucun verrou sur stats.db, rien de visible
+    count = 0
+    for params in batches:
+        with conn:
+            count += conn.executemany(sql, params).rowcount
+    bad = conn.execute(f"SELECT {', '.join(columns)} FROM import_raw WHERE {invalid} LIMIT 1").fetchone()
+    if bad:
+        raise SystemExit(f"❌ Ligne invalide : {bad} (rien n'a été importé)")
+    # 2) jeux distincts résolus (et créés) une seule fois
+    with conn:
+        cache: Dict[str, int] = {}
+        names = [name for (name,) in conn.execute("SELECT DISTINCT game FROM import_raw")]
+        conn.executemany("INSERT INTO import_games VALUES (?, ?)",
+                         [(name, st.resolve_game(conn, name, cache)) for name in names])
+    # 3) fusion : le bot n'attend jamais plus d'un lot (rowid 1..count, insertion séquentielle)
+    for first in range(1, count + 1, IMPORT_BATCH):
+        args = (first, first + IMPORT_BATCH - 1)
+        with conn:
+            if table == "game_stats":
+                st.bulk_add_stats(conn, select=merge, args=args)
+            else:
+                conn.execute(merge, args)
+    return count
+
+
+def import_file(db: str, table: str, path: str, fmt: str) -> int:
+    with closing(st.open_db(db)) as conn, _open(path, "r") as stream:
+        return import_rows(conn, table, *read_rows(stream, table, fmt))
+
+
+# --------------------------------------------------------------------- #
+# Snapshot
+# --------------------------------------------------------------------- #
+def snapshot(db: str, dest: str) -> None:
+    """Copie cohérente via l'API de sauvegarde SQLite. En WAL, une seule étape
+    (pages=-1) n'est qu'une transaction de lecture : l'écrivain du bot n'est pas
+    bloqué, et la copie ne redémarre pas à chaque écriture concurrente."""
+    with closing(st.connect(db, readonly=True)) as src, closing(sqlite3.connect(dest)) as dst:
+        src.backup(dst, pages=-1)
+
+
+# --------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export / import / sauvegarde de data/stats.db")
+    parser.add_argument("--db", default=st.DB_PATH, help=f"base SQLite (défaut: {st.DB_PATH})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name, help_ in (("export", "exporte une table (CSV ou JSONL)"),
+                        ("import", "ajoute le contenu d'un fichier à une table")):
+        p = sub.add_parser(name, help=help_)
+        p.add_argument("table", choices=sorted(TABLES))
+        p.add_argument("path", help="fichier .csv / .jsonl, « - » pour stdin/stdout")
+        p.add_argument("--format", choices=("csv", "jsonl"), help="défaut: selon l'extension")
+    p = sub.add_parser("snapshot", help="copie cohérente de la base (bot en marche)")
+    p.add_argument("dest")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.cmd == "snapshot":
+        snapshot(args.db, args.dest)
+        print(f"✅ Snapshot {args.db} → {args.dest} en {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+        return 0
+    fmt = _format(args.path, args.format)
+    if args.cmd == "export":
+        count = export(args.db, args.table, args.path, fmt)
+    else:
+        count = import_file(args.db, args.table, args.path, fmt)
+    elapsed = time.perf_counter() - t0
+    print(f"✅ {args.cmd} {args.table} : {count} lignes en {elapsed:.2f} s "
+          f"({count / elapsed if elapsed else 0:,.0f} lignes/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())